@@ -6,13 +6,17 @@ from langchain_core.messages import SystemMessage, HumanMessage
 
 from app.config.config import get_settings
 from app.utils.llms import LLMConfig, LLMManager, LLMType
-from app.utils.prompts import FINAL_SECTION_WRITER, FINAL_REPORT_FORMAT
+from app.utils.prompts import render_prompt, FINAL_REPORT_FORMAT
 from app.utils.state import ReportState, Section, SectionState
+from app.utils.websocket import send_ws_bytes
 import logging
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Patrón compilado una sola vez: write_final_sections lo aplica sobre cada
+# contexto y recompilarlo por llamada re-escanea el mismo literal.
+URL_PATTERN = re.compile(r'URL: (https?://\S+)')
+
 
 class ReportCompiler:
     """Class responsible for compiling and formatting the final report."""
@@ -26,12 +30,14 @@ class ReportCompiler:
         """
         self.settings = settings or get_settings()
         self.websocket = websocket
-        self.sources = set()  # Nuevo: Para almacenar las fuentes únicas
 
         # Initialize LLM manager with compilation-specific configuration
+        # compile_final_report consume astream chunk a chunk para reenviar
+        # progreso, así que el streaming sólo se apaga cuando no hay socket
+        # que lo lea (astream degrada a un único chunk en ese caso)
         llm_config = LLMConfig(
             temperature=0.7,  # Use deterministic output for compilation
-            streaming=True,
+            streaming=websocket is not None,
             max_tokens=8192  # Larger context for final compilation
         )
         self.llm_manager = LLMManager(llm_config)
@@ -65,7 +71,7 @@ class ReportCompiler:
     async def send_progress(self, message: str, data: dict = None):
         """Send progress updates through websocket"""
         if self.websocket:
-            await self.websocket.send_json({
+            await send_ws_bytes(self.websocket, {
                 "type": "compiler_progress",
                 "message": message,
                 "data": data
@@ -78,11 +84,9 @@ class ReportCompiler:
             completed_sections = state.get("completed_sections", [])
             formatted_sections = self.format_sections(completed_sections)
 
-            # Retornar estado completo actualizado
-            return {
-                **state,  # Mantener estado existente
-                "report_sections_from_research": formatted_sections
-            }
+            # Retornar sólo el delta: LangGraph mergea por clave y copiar el
+            # estado completo re-aplica los reducers sobre datos sin cambios
+            return {"report_sections_from_research": formatted_sections}
 
         except Exception as e:
             await self.send_progress("Error gathering sections", {"error": str(e)})
@@ -94,14 +98,17 @@ class ReportCompiler:
             section = state["section"]
             context = state.get("report_sections_from_research", "")
             
-            # Extraer y almacenar URLs del contexto
-            urls = re.findall(r'URL: (https?://\S+)', context)
-            self.sources.update(urls)
-            
+            # Extraer las URLs del contexto; van al estado del grafo (reducer
+            # de unión), no a la instancia: el compilador vive cacheado junto
+            # al grafo compilado y acumularlas aquí las filtraría entre runs
+            urls = URL_PATTERN.findall(context)
+
             await self.send_progress(f"Writing final section: {section.name}")
 
-            system_instructions = FINAL_SECTION_WRITER.format(
-                section_title=section.name,
+            # section_title no es un slot de la plantilla; el formatter
+            # estricto de PromptTemplate rechaza kwargs sin usar
+            system_instructions = render_prompt(
+                "FINAL_SECTION_WRITER",
                 section_topic=section.description,
                 context=context
             )
@@ -115,7 +122,8 @@ class ReportCompiler:
             
             # Solo retornar los campos que necesitamos actualizar
             return {
-                "completed_sections": state.get("completed_sections", []) + [section]
+                "completed_sections": state.get("completed_sections", []) + [section],
+                "sources": set(urls),
             }
 
         except Exception as e:
@@ -138,7 +146,7 @@ class ReportCompiler:
 
             # Agregar sección de referencias
             references_section = "\n\nReferences:\n"
-            for idx, source in enumerate(sorted(self.sources), 1):
+            for idx, source in enumerate(sorted(state.get("sources") or ()), 1):
                 references_section += f"[{idx}] {source}\n"
 
             # Join sections
@@ -216,7 +224,7 @@ class ReportCompiler:
 
             # Agregar la sección de referencias al final
             references_section = "\n\n## Referencias\n"
-            for idx, source in enumerate(sorted(self.sources), 1):
+            for idx, source in enumerate(sorted(state.get("sources") or ()), 1):
                 references_section += f"[{idx}] {source}\n"
 
             # Combinar el contenido del LLM con las referencias
@@ -1,18 +1,20 @@
 from typing import Annotated, TypedDict, List, Optional
+
 from langchain_core.messages import SystemMessage, HumanMessage
 from langchain_openai import ChatOpenAI
 from langgraph.constants import Send
 
 from app.config.config import get_settings
 from app.utils.llms import LLMManager, LLMConfig, LLMType
-from app.utils.prompts import REPORT_PLANNER_QUERY_WRITER, REPORT_PLANNER_INSTRUCTIONS
+from app.utils.prompts import render_prompt
+from app.utils.websocket import send_ws_bytes
 #from app.utils.state import ReportState, Section, Queries, Sections
-from app.services.tavilyService import tavily_search_async, deduplicate_and_format_sources
+from app.services.search import multi_provider_search
+from app.services.tavilyService import deduplicate_and_format_sources
 import logging
 
 from app.utils.state import ReportState, Queries, Sections
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 
@@ -25,18 +27,26 @@ class ReportPlanner:
         self.websocket = websocket
         
         # Initialize LLMManager with configuration
+        # El planner consume salidas estructuradas de un solo golpe:
+        # streaming sólo agregaría framing y callbacks por token
         llm_config = LLMConfig(
             temperature=0.0,
-            streaming=True,
+            streaming=False,
             max_tokens=2000
         )
         self.llm_manager = LLMManager(llm_config)
         self.primary_llm = self.llm_manager.get_llm(LLMType.GEMINI)
 
+        # Runnables estructurados ligados una vez: with_structured_output
+        # recorre el core-schema de Pydantic al bindear, no hace falta
+        # repetir esa caminata en cada invocación
+        self._queries_llm = self.primary_llm.with_structured_output(Queries)
+        self._sections_llm = self.primary_llm.with_structured_output(Sections)
+
     async def send_progress(self, message: str, data: dict = None):
         """Send progress updates through websocket"""
         if self.websocket:
-            await self.websocket.send_json({
+            await send_ws_bytes(self.websocket, {
                 "type": "planning_progress",
                 "message": message,
                 "data": data
@@ -51,8 +61,9 @@ class ReportPlanner:
         Returns:
             Queries object containing generated search queries
         """
-        structured_llm = self.primary_llm.with_structured_output(Queries)
-        system_instructions = REPORT_PLANNER_QUERY_WRITER.format(
+        structured_llm = self._queries_llm
+        system_instructions = render_prompt(
+            "REPORT_PLANNER_QUERY_WRITER",
             topic=topic,
             report_organization=self.settings.report_structure,
             number_of_queries=self.settings.number_of_queries
@@ -74,14 +85,16 @@ class ReportPlanner:
             Formatted string of search results
         """
         logger.debug(f"Conducting research with queries: {queries}")
-        search_docs = await tavily_search_async(
+        # Tavily y Jina corren en paralelo; la lista combinada ya viene
+        # deduplicada y normalizada a la forma de fuente de Tavily
+        sources = await multi_provider_search(
             queries,
             self.settings.tavily_topic,
             self.settings.tavily_days
         )
 
         return deduplicate_and_format_sources(
-            search_docs,
+            {'results': sources},
             max_tokens_per_source=1000,
             include_raw_content=False
         )
@@ -95,8 +108,9 @@ class ReportPlanner:
         Returns:
             Sections object containing generated report sections
         """
-        structured_llm = self.primary_llm.with_structured_output(Sections)
-        system_instructions = REPORT_PLANNER_INSTRUCTIONS.format(
+        structured_llm = self._sections_llm
+        system_instructions = render_prompt(
+            "REPORT_PLANNER_INSTRUCTIONS",
             topic=topic,
             report_organization=self.settings.report_structure,
             context=source_str
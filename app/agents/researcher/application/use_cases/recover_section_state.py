@@ -31,13 +31,10 @@ class RecoverSectionStateUseCase:
                 section["content"] = state["content"]
                 return section
                 
-            # Si falló o está incompleto, retornar el último estado conocido
-            return Section(
-                id=section.id,
-                name=section.name,
-                description=section.description,
-                content=state.get("content", "")
-            )
+            # Si falló o está incompleto, retornar el último estado conocido.
+            # model_copy usa construct internamente: la sección ya fue
+            # validada al parsearse, no hace falta re-validar la copia.
+            return section.model_copy(update={"content": state.get("content", "")})
             
         except Exception as e:
             logger.error(f"Error recovering state for section {section.id}: {str(e)}")
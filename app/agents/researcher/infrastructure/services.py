@@ -1,7 +1,9 @@
 from typing import List, Dict
+
 import google.generativeai as genai
 from starlette.websockets import WebSocket
 
+from app.utils.websocket import send_ws_bytes
 from ..domain.interfaces import WebSocketNotifier
 
 class WebSocketProgressNotifier(WebSocketNotifier):
@@ -10,7 +12,7 @@ class WebSocketProgressNotifier(WebSocketNotifier):
 
     async def send_progress(self, message: str, data: Dict = None):
         if self.websocket:
-            await self.websocket.send_json({
+            await send_ws_bytes(self.websocket, {
                 "type": "research_progress",
                 "message": message,
                 "data": data
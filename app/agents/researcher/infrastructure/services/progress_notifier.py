@@ -1,7 +1,10 @@
 import logging
 from typing import Optional, Dict, Any
+
 from fastapi import WebSocket
 
+from app.utils.websocket import send_ws_bytes
+
 logger = logging.getLogger(__name__)
 
 class ProgressNotifier:
@@ -37,7 +40,7 @@ class ProgressNotifier:
                 "message": message,
                 "data": data or {}
             }
-            await self.websocket.send_json(payload)
+            await send_ws_bytes(self.websocket, payload)
             
         except Exception as e:
             logger.error(f"WebSocket send error: {str(e)}")
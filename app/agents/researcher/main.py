@@ -6,7 +6,6 @@ from .infrastructure.services import GeminiService, TavilyService, WebSocketProg
 from .domain.entities import Section
 from app.config.config import get_settings
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 async def main():
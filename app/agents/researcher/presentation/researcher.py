@@ -31,15 +31,6 @@ from app.agents.researcher.infrastructure.services.prompt_generation_service imp
 from app.config.config import get_settings
 from app.utils.state import SectionState, Section
 
-# Configuración avanzada de logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    # handlers=[
-    #     logging.FileHandler('research.log'),
-    #     logging.StreamHandler(sys.stdout)
-    # ]
-)
 logger = logging.getLogger(__name__)
 
 
@@ -213,7 +204,8 @@ class ResearchManager:
 
     def _normalize_query(self, query: str) -> str:
         """Normalize a query by removing extra spaces and converting to lowercase."""
-        return re.sub(r'\s+', ' ', query.lower().strip())
+        # split/join colapsa espacios en un solo paso en C, sin motor de regex
+        return ' '.join(query.lower().split())
 
     def _get_query_hash(self, query: str) -> str:
         """Generate a hash for a query to help with deduplication."""
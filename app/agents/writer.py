@@ -3,17 +3,33 @@ from langgraph.types import Send
 from typing import AsyncGenerator, Dict, Any, Optional
 import asyncio
 import json
+import re
+
+import orjson
+
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
 
 from app.config.config import get_settings
 from app.utils.llms import LLMConfig, LLMManager, LLMType
 
-from app.utils.prompts import SECTION_WRITER
+from app.utils.prompts import render_prompt
 from app.utils.state import ReportState, Section
 import logging
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Settings nunca cambian después de load_dotenv(); capturarlas al importar evita
+# el lookup de lru_cache en cada constructor (get_settings queda para tests).
+SETTINGS = get_settings()
+
+# Delimitadores para batch prompting: el modelo responde K secciones marcadas
+# y este regex las separa de vuelta.
+SECTION_BATCH_PATTERN = re.compile(r"<<<SECTION (\d+)>>>(.*?)<<<END \1>>>", re.S)
+
+# Turno de usuario mínimo, precomputado una vez: la instrucción real vive al
+# final del system prompt para no pagar la frase constante en cada llamada.
+MINIMAL_HUMAN_MESSAGE = HumanMessage(content=".")
+
 class WriterEvent:
     """Class to represent different writer events for streaming"""
     def __init__(self, event_type: str, data: Dict[str, Any]):
@@ -31,20 +47,30 @@ class WriterEvent:
 class ReportWriter:
     """Class responsible for writing and organizing report sections."""
 
-    def __init__(self, settings=None, websocket=None):
+    def __init__(self, settings=None, websocket=None, batch_size: int = 4, streaming: bool = True):
         """Initialize ReportWriter with configuration settings.
 
         Args:
             settings: Optional application settings. If None, will load default settings.
             websocket: Optional websocket for streaming progress updates.
+            batch_size: Number of sections to combine per LLM call when batching.
+            streaming: Whether to request token streaming from the provider.
+                Callers that only use the ainvoke-based batched path should
+                pass False to avoid paying for chunked HTTP responses.
         """
-        self.settings = settings or get_settings()
+        self.settings = settings or SETTINGS
         self.websocket = websocket
+        self.batch_size = batch_size
+
+        # Cola de eventos de progreso: el loop que consume tokens del LLM no
+        # debe esperar al socket del cliente (head-of-line blocking).
+        self._event_q: Optional[asyncio.Queue] = None
+        self._sender_task: Optional[asyncio.Task] = None
 
         # Initialize LLM manager with specific configuration for report writing
         llm_config = LLMConfig(
             temperature=0.0,  # Use deterministic output for report writing
-            streaming=True,
+            streaming=streaming,
             max_tokens=2000  # Adjust based on expected section lengths
         )
         self.llm_manager = LLMManager(llm_config)
@@ -52,14 +78,55 @@ class ReportWriter:
         # Get primary LLM for report writing - using Claude for high-quality content generation
         self.primary_llm = self.llm_manager.get_llm(LLMType.GEMINI)
 
+    async def _drain_events(self):
+        """Reenvía los eventos encolados y termina al vaciar la cola.
+
+        La tarea vive sólo mientras hay eventos pendientes: un run no deja
+        una tarea aparcada en queue.get() reteniendo writer, cola y socket
+        por el resto del proceso. Si un envío falla (socket cerrado), se
+        descarta lo pendiente y se deja de encolar en vez de loguear un
+        error por evento indefinidamente.
+        """
+        while True:
+            try:
+                event = self._event_q.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                await self.websocket.send_bytes(event)
+            except Exception as e:
+                logger.error(f"Error sending progress event: {str(e)}")
+                # Socket muerto: soltar lo pendiente y cortar futuros envíos
+                self.websocket = None
+                while not self._event_q.empty():
+                    self._event_q.get_nowait()
+                return
+
     async def send_progress(self, message: str, data: dict = None):
         """Send progress updates through websocket"""
-        if self.websocket:
-            await self.websocket.send_json({
-                "type": "writing_progress",
-                "message": message,
-                "data": data
-            })
+        if not self.websocket:
+            return
+
+        if self._event_q is None:
+            self._event_q = asyncio.Queue(maxsize=1024)
+
+        # orjson a bytes: evita el json.dumps de stdlib y mantiene todos
+        # los frames del stream como binarios, igual que el resto de rutas
+        event = orjson.dumps({
+            "type": "writing_progress",
+            "message": message,
+            "data": data
+        })
+        try:
+            self._event_q.put_nowait(event)
+        except asyncio.QueueFull:
+            # Cliente lento: descartar el evento más viejo antes que frenar el LLM
+            self._event_q.get_nowait()
+            self._event_q.put_nowait(event)
+
+        # Re-crear la tarea sólo cuando la anterior ya drenó y terminó
+        if self._sender_task is None or self._sender_task.done():
+            self._sender_task = asyncio.create_task(self._drain_events())
 
     async def write_section(self, section: Section, context: str = None) -> AsyncGenerator[str, None]:
         """Write a single section with streaming progress"""
@@ -67,25 +134,64 @@ class ReportWriter:
             logger.debug(f"Starting write_section for: {section.name}")
             await self.send_progress("Starting section", {"section_name": section.name})
 
-            system_instructions = SECTION_WRITER.format(
+            system_instructions = render_prompt(
+                "SECTION_WRITER",
                 section_topic=section.description,
                 context=context if context else section.content
-            )
+            ) + "\n\nGenera el contenido de la sección."
             logger.debug(f"System instructions prepared for: {section.name}")
 
-            content_buffer = []
+            async def _run() -> list[str]:
+                """Consume el stream acotando la inactividad entre chunks.
+
+                El timeout aplica por chunk, no al stream completo: una
+                sección lenta pero viva no se aborta, sólo un stream que
+                deja de producir tokens. Los chunks se acumulan y se
+                publican únicamente si el intento completa, para que un
+                reintento no duplique texto ya enviado al cliente.
+                """
+                chunks = []
+                stream = self.primary_llm.astream([
+                    SystemMessage(content=system_instructions),
+                    MINIMAL_HUMAN_MESSAGE
+                ])
+                try:
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(
+                                stream.__anext__(),
+                                timeout=self.settings.llm_request_timeout,
+                            )
+                        except StopAsyncIteration:
+                            break
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug(f"Received chunk for {section.name}: {chunk.content[:50]}...")
+                        chunks.append(chunk.content)
+                finally:
+                    # Cerrar el generador del intento abortado antes de abrir otro
+                    await stream.aclose()
+                return chunks
+
+            # Un stream colgado bloquea el reporte entero: detectar la
+            # inactividad y reintentar sólo esta sección, no el reporte.
             logger.debug(f"Starting streaming for section: {section.name}")
-            async for chunk in self.primary_llm.astream([
-                SystemMessage(content=system_instructions),
-                HumanMessage(content="Generate section content")
-            ]):
-                logger.debug(f"Received chunk for {section.name}: {chunk.content[:50]}...")
-                content_buffer.append(chunk.content)
-                await self.send_progress("content_chunk", {"content": chunk.content})
-                yield chunk.content  # Yield each chunk for streaming
+            async for attempt in AsyncRetrying(
+                stop=stop_after_attempt(self.settings.llm_max_retries),
+                wait=wait_exponential_jitter(1, 10),
+                retry=retry_if_exception_type(asyncio.TimeoutError),
+                reraise=True,
+            ):
+                with attempt:
+                    chunks = await _run()
+
+            section.content = "".join(chunks)
+            # Flush diferido: sólo los chunks del intento exitoso llegan al
+            # cliente, en orden, como ráfaga que el batcher agrupa
+            for content in chunks:
+                await self.send_progress("content_chunk", {"content": content})
 
             logger.debug(f"Streaming completed for section: {section.name}")
-            section.content = "".join(content_buffer)
+            yield section.content
             await self.send_progress("section_complete", {
                 "section_name": section.name,
                 "content": section.content
@@ -96,6 +202,48 @@ class ReportWriter:
             await self.send_progress("error", {"error": str(e)})
             raise
 
+    async def _write_section_batch(self, sections: list[Section]) -> list[str]:
+        """Write several sections in a single LLM call using batch prompting.
+
+        Un solo prompt concatena K secciones y el modelo responde con
+        marcadores <<<SECTION n>>>...<<<END n>>>, amortizando el prefijo de
+        sistema y las idas y vueltas de red.
+
+        Raises:
+            ValueError: If the response does not contain one block per section.
+        """
+        prompt_parts = [render_prompt(
+            "SECTION_WRITER",
+            section_topic="(ver secciones numeradas abajo)",
+            context="(cada sección incluye su propio contexto)"
+        )]
+        for idx, section in enumerate(sections, 1):
+            prompt_parts.append(
+                f"\n### Section {idx}\n"
+                f"Topic: {section.description}\n"
+                f"Context: {section.content}"
+            )
+        prompt_parts.append(
+            "\n\nResponde con cada sección delimitada exactamente como "
+            "<<<SECTION n>>>contenido<<<END n>>> para n = 1..%d." % len(sections)
+        )
+
+        response = await asyncio.wait_for(
+            self.primary_llm.ainvoke([
+                SystemMessage(content="".join(prompt_parts)),
+                MINIMAL_HUMAN_MESSAGE
+            ]),
+            timeout=self.settings.llm_request_timeout,
+        )
+
+        matches = {int(num): content.strip()
+                   for num, content in SECTION_BATCH_PATTERN.findall(response.content)}
+        if len(matches) != len(sections):
+            raise ValueError(
+                f"Batch response contained {len(matches)} sections, expected {len(sections)}"
+            )
+        return [matches[idx] for idx in range(1, len(sections) + 1)]
+
     async def write_report(self, state: dict) -> AsyncGenerator[Dict, None]:
         """Process and write all sections with streaming updates"""
         try:
@@ -105,7 +253,39 @@ class ReportWriter:
             })
 
             final_content = []
-            for section in state["sections"]:
+            sections = state["sections"]
+            if self.websocket is None and self.batch_size > 1:
+                # Sin websocket no hay streaming que preservar: agrupar
+                # secciones en lotes y caer a la ruta sección-por-sección
+                # sólo si el parseo del lote falla.
+                for start in range(0, len(sections), self.batch_size):
+                    batch = sections[start:start + self.batch_size]
+                    try:
+                        contents = await self._write_section_batch(batch)
+                    except Exception as e:
+                        logger.warning(f"Batch write failed, falling back to per-section calls: {str(e)}")
+                        contents = None
+
+                    if contents is not None:
+                        for section, content in zip(batch, contents):
+                            section.content = content
+                            yield {
+                                "section": section.name,
+                                "content": content
+                            }
+                            final_content.append(section.content)
+                        continue
+
+                    for section in batch:
+                        async for content in self.write_section(section):
+                            yield {
+                                "section": section.name,
+                                "content": content
+                            }
+                        final_content.append(section.content)
+                sections = []
+
+            for section in sections:
                 logger.debug(f"Processing section in write_report: {section.name}")
                 async for content in self.write_section(section):
                     logger.debug(f"Yielding content from write_report for {section.name}")
@@ -144,7 +324,11 @@ class ReportWriter:
             raise
 
     def cleanup(self):
-        """Cleanup method to clear LLM caches when done."""
+        """Cleanup method to clear LLM caches and stop the event sender when done."""
+        if self._sender_task is not None:
+            self._sender_task.cancel()
+            self._sender_task = None
+            self._event_q = None
         self.llm_manager.clear_caches()
 
 
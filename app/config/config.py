@@ -1,17 +1,19 @@
 from functools import lru_cache
+from pathlib import Path
 from typing import Optional, Any
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from dataclasses import dataclass, field, fields
 from dotenv import load_dotenv
 from langchain_core.runnables import RunnableConfig
 import os
 from pydantic import Field
 
-# Cargar las variables del archivo .env
+# Cargar las variables del archivo .env (una sola vez por proceso; éste es
+# el único load_dotenv del repo y el import system no re-ejecuta el módulo)
 load_dotenv()
 
 
-@dataclass(kw_only=True)
+@dataclass(kw_only=True, slots=True, frozen=True)
 class LangGraphConfig:
     """Configuración específica para LangGraph"""
     number_of_queries: int = 2
@@ -26,18 +28,30 @@ class LangGraphConfig:
         configurable = (
             config["configurable"] if config and "configurable" in config else {}
         )
-        values: dict[str, Any] = {
-            f.name: os.environ.get(f.name.upper(), configurable.get(f.name))
-            for f in fields(cls)
-            if f.init
-        }
-        return cls(**{k: v for k, v in values.items() if v})
+        _env = os.environ.get
+        values: dict[str, Any] = {}
+        for name, env_name in cls._ENV_FIELDS:
+            value = _env(env_name, configurable.get(name))
+            if value:
+                values[name] = value
+        return cls(**values)
+
+
+# Pares (campo, VARIABLE_DE_ENTORNO) precomputados una vez: evita recorrer
+# la metadata del dataclass y repetir .upper() en cada invocación del grafo.
+LangGraphConfig._ENV_FIELDS = tuple(
+    [(f.name, f.name.upper()) for f in fields(LangGraphConfig) if f.init]
+)
+
+
+# Leída una sola vez al importar; Settings la referencia vía default_factory
+# para que pydantic no copie el literal en cada validación.
+_REPORT_STRUCTURE = Path(__file__).with_name("report_structure.md").read_text(encoding="utf-8")
 
 
 class Settings(BaseSettings):
     tavily_api_key: str
     openai_api_key: str
-    google_api_key: str
     anthropic_api_key: Optional[str] = None
     google_api_key: Optional[str] = None
     # Azure OpenAI Settings
@@ -55,61 +69,29 @@ class Settings(BaseSettings):
     langsmith_api_key: str
     langsmith_endpoint: str
     langsmith_project: str
-    # Report configuration
-    report_structure: str = """The report structure should focus on:
-1. Introduction:
-    - Brief description of the agent: What is it, and what is it for?
-    - Links to official documentation or the product's website.
-    - Context on why this agent was chosen.
-
-2. Research/Testing Objectives:
-    - What was expected to be learned or validated with the agent?
-    - Specific scope and goals.
-
-3. Key Features:
-    - Main functionalities.
-    - Problems it solves.
-    - Integrations with other tools or APIs.
-
-4. Prerequisites:
-    - Languages, libraries, accounts, or subscriptions required.
-    - Recommended technical knowledge.
-
-5. Installation/Initial Setup:
-    - Step-by-step instructions (clear commands).
-    - Environment variables, API keys, account access, etc.
-
-6. Practical Examples/Use Cases:
-    - Simple reproducible case with clear instructions.
-    - Code snippets, screenshots, or diagrams (if applicable).
-
-7. Advantages and Limitations:
-    - Strengths (e.g., ease, performance, scalability).
-    - Weaknesses (e.g., complexity, technical limitations, costs).
-
-8. Lessons Learned and Best Practices:
-    - Tips for using the tool more effectively.
-    - Challenges encountered and how they were overcome.
-
-9. Next Steps/Future Development:
-    - Extension ideas, new use cases, or possible improvements.
-
-10. References and Resources:
-    - Official documentation.
-    - Links to external tutorials, forums, and communities.
-    
-"""
+    # Report configuration: la plantilla (multi-KB) vive en un archivo aparte
+    # para no cargar el literal como default de campo pydantic.
+    report_structure: str = Field(default_factory=lambda: _REPORT_STRUCTURE)
 
     number_of_queries: int = 3
     tavily_topic: str = "general"
     tavily_days: Optional[int] = 7
-    jina_api_key: str = Field(..., env='JINA_API_KEY')
-    serp_api_key: str = Field(..., env='SERP_API_KEY')  # Para el servicio de fallback
-    store_mardown_endpoint: str = Field(..., env='STORE_MARDOWN_ENDPOINT')
-    class Config:
-        env_file = ".env"
+    # LLM resilience configuration
+    llm_request_timeout: float = 30.0
+    llm_max_retries: int = 3
+    # Tope de ramas Send concurrentes al ejecutar el grafo
+    max_parallel_agents: int = 5
+    jina_api_key: str = Field(..., validation_alias='JINA_API_KEY')
+    serp_api_key: str = Field(..., validation_alias='SERP_API_KEY')  # Para el servicio de fallback
+    store_mardown_endpoint: str = Field(..., validation_alias='STORE_MARDOWN_ENDPOINT')
 
+    model_config = SettingsConfigDict(
+        env_file=".env", case_sensitive=False, frozen=True, extra="ignore"
+    )
 
-@lru_cache()
+
+@lru_cache(maxsize=1)
 def get_settings():
     return Settings()
+
+
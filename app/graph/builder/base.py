@@ -1,35 +1,44 @@
-from abc import ABC, abstractmethod
-from langgraph.graph import StateGraph
-
-
-class GraphBuilder(ABC):
-    """Clase base abstracta para los constructores de grafos"""
-
-    def __init__(self):
-        self.graph = None
-
-    @abstractmethod
-    def init_graph(self) -> None:
-        """Inicializa el grafo con su configuración base"""
-        pass
-
-    @abstractmethod
-    def add_nodes(self) -> None:
-        """Añade los nodos al grafo"""
-        pass
-
-    @abstractmethod
-    def add_edges(self) -> None:
-        """Añade las conexiones entre nodos"""
-        pass
-
-    def get_graph(self) -> StateGraph:
-        """Retorna el grafo construido"""
-        return self.graph
-
-    def build(self) -> StateGraph:
-        """Construye y retorna el grafo completo"""
-        self.init_graph()
-        self.add_nodes()
-        self.add_edges()
-        return self.get_graph()
+from abc import ABC, abstractmethod
+from operator import attrgetter
+from typing import ClassVar
+
+from langgraph.graph import StateGraph
+
+
+class GraphBuilder(ABC):
+    """Clase base abstracta para los constructores de grafos"""
+
+    # Topología declarativa: (nombre_nodo, ruta_de_atributo) y (origen, destino).
+    # Los subclases simples sólo listan sus tuplas y el base las registra en
+    # un único recorrido; las que necesitan edges condicionales sobreescriben.
+    NODES: ClassVar[tuple] = ()
+    EDGES: ClassVar[tuple] = ()
+
+    def __init__(self):
+        self.graph = None
+
+    @abstractmethod
+    def init_graph(self) -> None:
+        """Inicializa el grafo con su configuración base"""
+        pass
+
+    def add_nodes(self) -> None:
+        """Añade los nodos al grafo"""
+        for name, attr in self.NODES:
+            self.graph.add_node(name, attrgetter(attr)(self))
+
+    def add_edges(self) -> None:
+        """Añade las conexiones entre nodos"""
+        for source, target in self.EDGES:
+            self.graph.add_edge(source, target)
+
+    def get_graph(self) -> StateGraph:
+        """Retorna el grafo construido"""
+        return self.graph
+
+    def build(self) -> StateGraph:
+        """Construye y retorna el grafo completo"""
+        self.init_graph()
+        self.add_nodes()
+        self.add_edges()
+        return self.get_graph()
@@ -1,18 +1,51 @@
-from langgraph.graph import StateGraph
-
-from app.graph.report_builder import ReportGraphBuilder
-from app.graph.researcher_builder import ResearcherGraphBuilder
-
-
-class GraphDirector:
-    """Director que maneja la construcción y ejecución de grafos"""
-
-    @staticmethod
-    def construct_researcher_graph(websocket=None) -> StateGraph:
-        builder = ResearcherGraphBuilder(websocket=websocket)
-        return builder.build()
-
-    @staticmethod
-    def construct_report_graph(websocket=None) -> StateGraph:
-        builder = ReportGraphBuilder(websocket=websocket)
-        return builder.build()
+from functools import lru_cache
+
+from langgraph.graph import StateGraph
+
+from app.graph.report_builder import ReportGraphBuilder
+from app.graph.researcher_builder import ResearcherGraphBuilder
+
+
+# Sin websocket el grafo resultante es idéntico en cada llamada; cachearlo
+# evita re-registrar nodos y edges en caminos calientes (jobs de fondo, tests).
+# Las variantes con websocket no son cacheables: el socket cambia por conexión.
+@lru_cache(maxsize=1)
+def _build_researcher_graph() -> StateGraph:
+    return ResearcherGraphBuilder().build()
+
+
+@lru_cache(maxsize=1)
+def _build_report_graph() -> StateGraph:
+    return ReportGraphBuilder().build()
+
+
+@lru_cache(maxsize=1)
+def _compiled_report_graph():
+    # Compilar recorre el grafo entero construyendo el Pregel; para la
+    # variante sin websocket el resultado es reutilizable entre requests.
+    return _build_report_graph().compile()
+
+
+class GraphDirector:
+    """Director que maneja la construcción y ejecución de grafos"""
+
+    @staticmethod
+    def construct_researcher_graph(websocket=None) -> StateGraph:
+        if websocket is None:
+            return _build_researcher_graph()
+        builder = ResearcherGraphBuilder(websocket=websocket)
+        return builder.build()
+
+    @staticmethod
+    def construct_report_graph(websocket=None) -> StateGraph:
+        if websocket is None:
+            return _build_report_graph()
+        builder = ReportGraphBuilder(websocket=websocket)
+        return builder.build()
+
+    @staticmethod
+    def compiled_report_graph(websocket=None):
+        """Grafo de reportes ya compilado; cacheado cuando no hay websocket"""
+        if websocket is None:
+            return _compiled_report_graph()
+        return GraphDirector.construct_report_graph(websocket=websocket).compile()
@@ -1,72 +1,139 @@
-from langgraph.constants import START, END
-from langgraph.graph import StateGraph
-
-from app.agents.researcher import ResearchManager
-from app.graph.builder.base import GraphBuilder
-from app.utils.state import ReportState
-from app.agents.planner import ReportPlanner
-from app.agents.compiler import (
-    ReportCompiler
-)
-from app.agents.writer import ReportWriter
-
-
-class ReportGraphBuilder(GraphBuilder):
-    """Constructor del grafo de reportes"""
-
-    def __init__(self, websocket=None):
-        super().__init__()
-        self.websocket = websocket
-        self.researcher_graph = None
-        self.planner = ReportPlanner(websocket=websocket)
-        self.writer = ReportWriter(websocket=websocket)
-        self.research_manager = ResearchManager(websocket=websocket)
-        self.compiler = ReportCompiler(websocket=websocket)
-
-    def build(self) -> StateGraph:
-        """Construye y retorna el grafo de estados"""
-        # Inicializar el grafo
-        self.init_graph()
-        
-        # Agregar nodos y edges
-        self.add_nodes()
-        self.add_edges()
-        
-        return self.graph
-
-    def init_graph(self) -> None:
-        self.graph = StateGraph(ReportState)
-        # Inicializa y compila el grafo de investigación
-        from .researcher_builder import ResearcherGraphBuilder
-        researcher_builder = ResearcherGraphBuilder(websocket=self.websocket)
-        self.researcher_graph = researcher_builder.build().compile()
-
-    def add_nodes(self) -> None:
-        self.graph.add_node("plan", self.planner.plan_report)
-        self.graph.add_node("research", self.researcher_graph)
-        self.graph.add_node("gather_completed_sections", self.compiler.gather_completed_sections)
-        self.graph.add_node("write_final_sections", self.compiler.write_final_sections)
-        self.graph.add_node("compile_final_report", self.compiler.compile_final_report)
-
-    def add_edges(self) -> None:
-        # 1. Plan -> Research
-        self.graph.add_edge(START, "plan")
-        self.graph.add_conditional_edges(
-            "plan",
-            ReportPlanner.initiate_section_writing,
-            ["research"]
-        )
-
-        # 2. Research -> Gather
-        self.graph.add_edge("research", "gather_completed_sections")
-        
-        # 3. Gather -> Write Final
-        self.graph.add_conditional_edges(
-            "gather_completed_sections",
-            self.writer.initiate_final_section_writing,
-            ["write_final_sections"]
-        )
-
-        # 4. Write -> Compile
-        self.graph.add_edge("write_final_sections", "compile_final_report")
-        self.graph.add_edge("compile_final_report", END)
+from functools import lru_cache
+
+from langgraph.constants import START, END
+from langgraph.graph import StateGraph
+
+from app.agents.researcher import ResearchManager
+from app.graph.builder.base import GraphBuilder
+from app.graph.researcher_builder import ResearcherGraphBuilder
+from app.utils.state import ReportState
+from app.agents.planner import ReportPlanner
+from app.agents.compiler import (
+    ReportCompiler
+)
+from app.agents.writer import ReportWriter
+
+
+class _Lazy:
+    """Construye el objetivo en el primer uso y cachea la instancia.
+
+    Los agentes instancian clientes LLM y Settings en __init__; para builds
+    que sólo inspeccionan la forma del grafo eso es trabajo (y memoria)
+    desperdiciado, así que cada agente se crea cuando su nodo dispara.
+    """
+
+    __slots__ = ("factory", "value")
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.value = None
+
+    def __call__(self):
+        if self.value is None:
+            self.value = self.factory()
+        return self.value
+
+
+@lru_cache(maxsize=1)
+def _compiled_researcher_graph():
+    """Subgrafo de investigación compilado, compartido entre builders.
+
+    Compilar repite la validación topológica y el registro de nodos; sin
+    websocket el resultado es idéntico en cada construcción del grafo de
+    reportes, así que se compila una sola vez por proceso. El notificador
+    de progreso del ResearchManager capturado aquí queda sin socket, por lo
+    que las construcciones con websocket siguen compilando el suyo propio.
+    """
+    return ResearcherGraphBuilder().build().compile()
+
+
+class ReportGraphBuilder(GraphBuilder):
+    """Constructor del grafo de reportes"""
+
+    def __init__(self, websocket=None):
+        super().__init__()
+        self.websocket = websocket
+        self.researcher_graph = None
+        self._planner = _Lazy(lambda: ReportPlanner(websocket=websocket))
+        # Sin websocket el writer usa la ruta batched con ainvoke: pedir
+        # streaming al proveedor ahí sólo paga framing por token sin lector
+        self._writer = _Lazy(
+            lambda: ReportWriter(websocket=websocket, streaming=websocket is not None)
+        )
+        self._research_manager = _Lazy(lambda: ResearchManager(websocket=websocket))
+        self._compiler = _Lazy(lambda: ReportCompiler(websocket=websocket))
+
+    @property
+    def planner(self) -> ReportPlanner:
+        return self._planner()
+
+    @property
+    def writer(self) -> ReportWriter:
+        return self._writer()
+
+    @property
+    def research_manager(self) -> ResearchManager:
+        return self._research_manager()
+
+    @property
+    def compiler(self) -> ReportCompiler:
+        return self._compiler()
+
+    def init_graph(self) -> None:
+        self.graph = StateGraph(ReportState)
+        # Inicializa y compila el grafo de investigación
+        if self.websocket is None:
+            self.researcher_graph = _compiled_researcher_graph()
+        else:
+            researcher_builder = ResearcherGraphBuilder(websocket=self.websocket)
+            self.researcher_graph = researcher_builder.build().compile()
+
+    def add_nodes(self) -> None:
+        # Se registran wrappers async en lugar de métodos ligados para que
+        # los agentes no se construyan hasta la primera ejecución del nodo.
+        self.graph.add_node("plan", self._run_plan)
+        # El subgrafo se registra con tags para que LangGraph proyecte sólo
+        # las claves de estado que cruzan la frontera padre/subgrafo en vez
+        # de copiar el estado completo por cada sección despachada vía Send.
+        self.graph.add_node("research", self.researcher_graph.with_config({"tags": ["research"]}))
+        self.graph.add_node("gather_completed_sections", self._run_gather_completed_sections)
+        self.graph.add_node("write_final_sections", self._run_write_final_sections)
+        self.graph.add_node("compile_final_report", self._run_compile_final_report)
+
+    def add_edges(self) -> None:
+        # 1. Plan -> Research
+        self.graph.add_edge(START, "plan")
+        self.graph.add_conditional_edges(
+            "plan",
+            ReportPlanner.initiate_section_writing,
+            ["research"]
+        )
+
+        # 2. Research -> Gather
+        self.graph.add_edge("research", "gather_completed_sections")
+
+        # 3. Gather -> Write Final
+        self.graph.add_conditional_edges(
+            "gather_completed_sections",
+            self._initiate_final_section_writing,
+            ["write_final_sections"]
+        )
+
+        # 4. Write -> Compile
+        self.graph.add_edge("write_final_sections", "compile_final_report")
+        self.graph.add_edge("compile_final_report", END)
+
+    async def _run_plan(self, state):
+        return await self.planner.plan_report(state)
+
+    async def _run_gather_completed_sections(self, state):
+        return await self.compiler.gather_completed_sections(state)
+
+    async def _run_write_final_sections(self, state):
+        return await self.compiler.write_final_sections(state)
+
+    async def _run_compile_final_report(self, state):
+        return await self.compiler.compile_final_report(state)
+
+    async def _initiate_final_section_writing(self, state):
+        return await self.writer.initiate_final_section_writing(state)
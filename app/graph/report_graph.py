@@ -3,3 +3,7 @@ from app.graph.director import GraphDirector
 def get_report_graph(websocket=None):
     """Obtiene una instancia del grafo de reporte con websocket configurado"""
     return GraphDirector.construct_report_graph(websocket=websocket)
+
+# Grafo sin websocket referenciado por langgraph.json y los consumidores
+# que no streamean progreso (es el build cacheado del director).
+report_graph = GraphDirector.construct_report_graph()
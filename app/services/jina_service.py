@@ -1,63 +1,158 @@
+import asyncio
+import hashlib
 import logging
-from typing import List, Dict
-import aiohttp
+from functools import lru_cache
+from typing import Iterator, List, Dict, Optional
+import httpx
+import orjson
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+
+from app.services.url_utils import canonical_url
 
 logger = logging.getLogger(__name__)
 
+# Tope de POSTs simultáneos contra la API de Jina
+_MAX_CONCURRENT_SEARCHES = 5
+
+# Cliente compartido del proceso con HTTP/2: las búsquedas concurrentes se
+# multiplexan como streams sobre una sola conexión TCP/TLS en lugar de abrir
+# un socket por request en vuelo.
+_SESSION: Optional[httpx.AsyncClient] = None
+_SESSION_API_KEY: Optional[str] = None
+
+
+async def _get_session(api_key: str) -> httpx.AsyncClient:
+    """Devuelve el cliente compartido, creándolo perezosamente.
+
+    Los headers viven en el cliente (no por request): httpx los reutiliza
+    sin reconstruir el dict en cada POST. Si cambia la API key se recrea
+    el cliente, cosa que en la práctica no pasa dentro de un proceso.
+    """
+    global _SESSION, _SESSION_API_KEY
+    if _SESSION is None or _SESSION.is_closed or _SESSION_API_KEY != api_key:
+        if _SESSION is not None and not _SESSION.is_closed:
+            await _SESSION.aclose()
+        _SESSION = httpx.AsyncClient(
+            http2=True,
+            timeout=30.0,
+            limits=httpx.Limits(
+                max_connections=32,
+                max_keepalive_connections=8,
+                keepalive_expiry=30.0,
+            ),
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json",
+            },
+        )
+        _SESSION_API_KEY = api_key
+    return _SESSION
+
+
+async def close_session() -> None:
+    """Cierra el cliente compartido; llamar al apagar la aplicación."""
+    global _SESSION
+    if _SESSION is not None and not _SESSION.is_closed:
+        await _SESSION.aclose()
+    _SESSION = None
+
+
 async def jina_search_async(queries: List[str], api_key: str) -> List[Dict]:
     """Perform web searches using Jina API."""
     results = []
-    
-    async with aiohttp.ClientSession() as session:
-        for query in queries:
-            try:
-                headers = {
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json"
-                }
-                
-                data = {
-                    "query": query,
-                    "top_k": 10,  # Número de resultados a retornar
-                }
-                
-                async with session.post(
-                    "https://api.jina.ai/v1/search",
-                    headers=headers,
-                    json=data
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        results.extend(result.get('data', []))
-                    else:
-                        logger.error(f"Jina API error: {response.status}")
-                        
-            except Exception as e:
-                logger.error(f"Error in Jina search: {str(e)}")
-                continue
-                
+
+    semaphore = asyncio.Semaphore(_MAX_CONCURRENT_SEARCHES)
+    session = await _get_session(api_key)
+
+    async def _fetch(query: str) -> List[Dict]:
+        # Serializado una vez con orjson (el Content-Type ya vive en la
+        # sesión); con json= httpx re-serializaría con json.dumps en cada
+        # intento del retry
+        payload = orjson.dumps({
+            "query": query,
+            "top_k": 10,  # Número de resultados a retornar
+        })
+        async with semaphore:
+            # Reintentar errores de transporte, timeouts y 5xx transitorios;
+            # el timeout del cliente (30s) acota cada intento.
+            async for attempt in AsyncRetrying(
+                stop=stop_after_attempt(3),
+                wait=wait_exponential_jitter(initial=0.5, max=4),
+                retry=retry_if_exception_type((httpx.HTTPError, asyncio.TimeoutError)),
+                reraise=True,
+            ):
+                with attempt:
+                    response = await session.post(
+                        "https://api.jina.ai/v1/search",
+                        content=payload
+                    )
+                    # 429 y 5xx son transitorios: levantar para que tenacity
+                    # reintente con backoff en vez de perder la consulta
+                    if response.status_code >= 500 or response.status_code == 429:
+                        response.raise_for_status()
+
+            if response.status_code == 200:
+                # orjson parsea los payloads de decenas de KB bastante más
+                # rápido que el json.loads estándar que usa response.json()
+                result = orjson.loads(response.content)
+                return result.get('data', [])
+            logger.error(f"Jina API error: {response.status_code}")
+            return []
+
+    # Las búsquedas son I/O puro e independientes: despacharlas en
+    # paralelo baja el tiempo total de la suma al máximo por consulta.
+    fetched = await asyncio.gather(
+        *[_fetch(query) for query in queries],
+        return_exceptions=True
+    )
+
+    for item in fetched:
+        if isinstance(item, BaseException):
+            logger.error(f"Error in Jina search: {str(item)}")
+        else:
+            results.extend(item)
+
     return results
 
-def deduplicate_and_format_sources(search_results: List[Dict], max_tokens_per_source: int = 5000) -> str:
-    """Format and deduplicate search results."""
-    seen_urls = set()
-    formatted_sources = []
-    
+
+@lru_cache(maxsize=4096)
+def _format_one(url: str, title: str, snippet: str) -> str:
+    """Formatea una fuente; cacheado porque secciones de un mismo reporte
+    suelen repetir las mismas URLs y el f-string multilínea no es gratis."""
+    # Sin triple-quote indentado: evita hornear espacios de relleno en cada fila
+    return f"Title: {title}\nURL: {url}\nContent: {snippet}\n---\n"
+
+
+def iter_formatted_sources(search_results: List[Dict]) -> Iterator[str]:
+    """Yield formatted source chunks, deduplicated by URL
+
+    Generador por fuente: consumidores que escriben a un stream emiten
+    cada chunk sin materializar el string completo.
+    """
+    # Dedup en un solo dict (ordenado por inserción), como en tavilyService.
+    # La clave es un digest blake2b de 8 bytes en vez del string completo de
+    # la URL: para lotes grandes reduce el footprint del dict y el costo de
+    # hashear/comparar claves largas. Colisiones a 64 bits son despreciables
+    # a escala de un reporte.
+    # setdefault hashea la clave una sola vez por fuente
+    unique = {}
     for result in search_results:
         url = result.get('url')
-        if url and url not in seen_urls:
-            seen_urls.add(url)
-            
-            title = result.get('title', '')
-            snippet = result.get('snippet', '')
-            
-            formatted_source = f"""
-            Title: {title}
-            URL: {url}
-            Content: {snippet}
-            ---
-            """
-            
-            formatted_sources.append(formatted_source)
-            
-    return "\n".join(formatted_sources) 
\ No newline at end of file
+        if url:
+            key = hashlib.blake2b(canonical_url(url).encode(), digest_size=8).digest()
+            unique.setdefault(key, result)
+
+    # Un solo statement de desempaque por fuente; el .get ligado fuera del
+    # loop evita el LOAD_METHOD por campo en cada iteración
+    first = True
+    for result in unique.values():
+        if not first:
+            yield "\n"
+        first = False
+        get = result.get
+        yield _format_one(get('url'), get('title', ''), get('snippet', ''))
+
+
+def deduplicate_and_format_sources(search_results: List[Dict], max_tokens_per_source: int = 5000) -> str:
+    """Format and deduplicate search results."""
+    return "".join(iter_formatted_sources(search_results))
@@ -0,0 +1,69 @@
+import asyncio
+import hashlib
+import logging
+from typing import Dict, List, Optional
+
+from app.config.config import get_settings
+from app.services.jina_service import jina_search_async
+from app.services.tavilyService import tavily_search_async
+from app.services.url_utils import canonical_url
+
+logger = logging.getLogger(__name__)
+
+
+def _merge_and_dedup(tavily_responses, jina_results) -> List[Dict]:
+    """Une resultados de ambos proveedores deduplicando por URL.
+
+    La clave es un digest blake2b de 8 bytes, igual que en los servicios
+    individuales. Tavily llega primero en el orden de mérito: sus entradas
+    ganan ante una URL repetida de Jina. Las fuentes de Jina se normalizan
+    a la forma de Tavily (snippet -> content) para que el formateador
+    compartido de tavilyService acepte la lista combinada.
+    """
+    unique: Dict[bytes, Dict] = {}
+
+    if isinstance(tavily_responses, BaseException):
+        logger.error(f"Tavily search failed: {str(tavily_responses)}")
+        tavily_responses = []
+    if isinstance(jina_results, BaseException):
+        logger.error(f"Jina search failed: {str(jina_results)}")
+        jina_results = []
+
+    for response in tavily_responses:
+        for source in response.get('results', []):
+            url = source.get('url')
+            if url:
+                key = hashlib.blake2b(canonical_url(url).encode(), digest_size=8).digest()
+                unique.setdefault(key, source)
+
+    for result in jina_results:
+        url = result.get('url')
+        if url:
+            key = hashlib.blake2b(canonical_url(url).encode(), digest_size=8).digest()
+            unique.setdefault(key, {
+                'url': url,
+                'title': result.get('title', ''),
+                'content': result.get('snippet', ''),
+            })
+
+    return list(unique.values())
+
+
+async def multi_provider_search(
+        queries: List[str],
+        topic: str = "general",
+        days: Optional[int] = None,
+) -> List[Dict]:
+    """Consulta Tavily y Jina en paralelo y combina los resultados.
+
+    Ambos proveedores son I/O independiente: dispararlos bajo gather baja
+    el tiempo de pared de la suma al máximo de los dos. Si un proveedor
+    falla se loguea y se sigue con los resultados del otro.
+    """
+    settings = get_settings()
+    tavily_responses, jina_results = await asyncio.gather(
+        tavily_search_async(queries, topic, days),
+        jina_search_async(queries, settings.jina_api_key),
+        return_exceptions=True,
+    )
+    return _merge_and_dedup(tavily_responses, jina_results)
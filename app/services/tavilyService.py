@@ -1,12 +1,21 @@
 import asyncio
-from typing import List, Optional
+import hashlib
+import logging
+from typing import Iterator, List, Optional
 from tavily import AsyncTavilyClient
 
 from app.config.config import get_settings
+from app.services.url_utils import canonical_url
+
+logger = logging.getLogger(__name__)
 
 settings = get_settings()
 tavily_async_client = AsyncTavilyClient(api_key=settings.tavily_api_key)
 
+# Tope de búsquedas simultáneas contra Tavily: un gather sin límite sobre
+# lotes grandes dispara rate-limits del proveedor y agota el pool HTTP.
+_MAX_CONCURRENT_SEARCHES = 8
+
 
 async def tavily_search_async(
         search_queries: List[str],
@@ -14,30 +23,44 @@ async def tavily_search_async(
         days: Optional[int] = None
 ):
     """Perform parallel web searches using Tavily API"""
-    search_tasks = []
+    semaphore = asyncio.Semaphore(_MAX_CONCURRENT_SEARCHES)
 
-    for query in search_queries:
-        search_params = {
-            "query": query,
-            "max_results": 5,
-            "include_raw_content": True,
-            "topic": topic
-        }
+    # Parámetros invariantes hoisted fuera del loop: un solo dict y un solo
+    # branch de topic para las N consultas
+    base_params = {
+        "max_results": 5,
+        "include_raw_content": True,
+        "topic": topic
+    }
+    if topic == "news" and days is not None:
+        base_params["days"] = days
 
-        if topic == "news" and days is not None:
-            search_params["days"] = days
+    async def _one(query: str):
+        async with semaphore:
+            return await tavily_async_client.search(query=query, **base_params)
 
-        # Use the async client's search method
-        search_tasks.append(
-            tavily_async_client.search(**search_params)
-        )
+    # return_exceptions evita que una consulta fallida cancele a sus hermanas
+    responses = await asyncio.gather(
+        *[_one(query) for query in search_queries],
+        return_exceptions=True
+    )
 
-    # Now gather will work correctly with the coroutines
-    return await asyncio.gather(*search_tasks)
+    results = []
+    for response in responses:
+        if isinstance(response, BaseException):
+            logger.error(f"Error in Tavily search: {str(response)}")
+        else:
+            results.append(response)
 
+    return results
 
-def deduplicate_and_format_sources(search_response, max_tokens_per_source, include_raw_content=True):
-    """Format and deduplicate search results"""
+
+def iter_formatted_sources(search_response, max_tokens_per_source, include_raw_content=True) -> Iterator[str]:
+    """Yield formatted source chunks, deduplicated by URL
+
+    Generador por fuente: los consumidores que escriben a un stream pueden
+    emitir cada chunk sin materializar el string completo del reporte.
+    """
     # Convert to list of results
     if isinstance(search_response, dict):
         sources_list = search_response['results']
@@ -49,25 +72,36 @@ def deduplicate_and_format_sources(search_response, max_tokens_per_source, inclu
             else:
                 sources_list.extend(response)
 
-    # Deduplicate by URL
+    # Deduplicate by URL: la clave es un digest blake2b de 8 bytes, más
+    # barato de hashear/almacenar que URLs de cientos de caracteres
+    # setdefault hashea la clave una sola vez por fuente (el patrón
+    # not-in + asignación la hasheaba dos veces en cada miss)
     unique_sources = {}
     for source in sources_list:
-        if source['url'] not in unique_sources:
-            unique_sources[source['url']] = source
+        key = hashlib.blake2b(canonical_url(source['url']).encode(), digest_size=8).digest()
+        unique_sources.setdefault(key, source)
 
-    # Format output
-    formatted_text = "Sources:\n\n"
+    yield "Sources:\n\n"
+    char_limit = max_tokens_per_source * 4
     for source in unique_sources.values():
-        formatted_text += f"Source {source['title']}:\n"
-        formatted_text += f"URL: {source['url']}\n"
-        formatted_text += f"Content: {source['content']}\n\n"
+        yield f"Source {source['title']}:\n"
+        yield f"URL: {source['url']}\n"
+        yield f"Content: {source['content']}\n\n"
 
         if include_raw_content:
             raw_content = source.get('raw_content', '')
             if raw_content:
-                char_limit = max_tokens_per_source * 4
+                # El sufijo va como chunk separado: concatenarlo al slice
+                # duplicaría el contenido truncado (que puede ser de MBs)
                 if len(raw_content) > char_limit:
-                    raw_content = raw_content[:char_limit] + "..."
-                formatted_text += f"Full content: {raw_content}\n\n"
+                    yield f"Full content: {raw_content[:char_limit]}"
+                    yield "...\n\n"
+                else:
+                    yield f"Full content: {raw_content}\n\n"
+
 
-    return formatted_text.strip()
\ No newline at end of file
+def deduplicate_and_format_sources(search_response, max_tokens_per_source, include_raw_content=True):
+    """Format and deduplicate search results"""
+    return "".join(
+        iter_formatted_sources(search_response, max_tokens_per_source, include_raw_content)
+    ).strip()
\ No newline at end of file
@@ -0,0 +1,22 @@
+from functools import lru_cache
+from urllib.parse import urlparse, urlunparse
+
+# Prefijos de parámetros de tracking que no cambian el documento apuntado
+_TRACKING_PREFIXES = ("utm_", "gclid", "fbclid")
+
+
+@lru_cache(maxsize=4096)
+def canonical_url(url: str) -> str:
+    """Normaliza una URL para deduplicación.
+
+    "https://x/a" y "https://x/a/" (o con utm_*) apuntan al mismo documento;
+    tratarlas como distintas infla el contexto del LLM con casi-duplicados.
+    Cacheado porque las mismas URLs se repiten entre Jina y Tavily dentro
+    de un reporte.
+    """
+    p = urlparse(url)
+    query = "&".join(
+        kv for kv in p.query.split("&")
+        if kv and not kv.startswith(_TRACKING_PREFIXES)
+    )
+    return urlunparse((p.scheme, p.netloc.lower(), p.path.rstrip("/"), "", query, ""))
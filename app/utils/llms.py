@@ -12,7 +12,7 @@ including OpenAI, Anthropic, and Google Vertex AI. It includes:
 
 from enum import Enum
 import logging
-from functools import lru_cache
+import threading
 from typing import Optional, Union
 from urllib.parse import urlparse
 
@@ -21,10 +21,8 @@ from langchain_anthropic import ChatAnthropic
 from langchain_google_vertexai import ChatVertexAI
 from langchain.callbacks.manager import CallbackManager
 from langchain.callbacks.streaming_stdout import StreamingStdOutCallbackHandler
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -47,6 +45,9 @@ class LLMConfig(BaseModel):
     """Configuration for LLM instances"""
     temperature: float = Field(default=0.0, ge=0.0, le=2.0)
     streaming: bool = Field(default=True)
+    # Handler de stdout por token: sólo útil en desarrollo; en producción
+    # agrega un despacho de callback por token en el camino caliente
+    streaming_callbacks: bool = Field(default=False)
     max_tokens: Optional[int] = Field(default=None)
 
     # Azure specific settings
@@ -55,8 +56,23 @@ class LLMConfig(BaseModel):
     azure_api_version: Optional[str] = None
     azure_api_key: Optional[str] = None
 
-    class Config:
-        arbitrary_types_allowed = True
+    # Congelada: Pydantic genera __hash__, así la config sirve directamente
+    # como clave del registro global y es segura de compartir entre threads.
+    # Para variar una config existente usar config.model_copy(update={...}).
+    model_config = ConfigDict(frozen=True, arbitrary_types_allowed=True)
+
+
+# Registro global de instancias LLM, compartido entre managers del proceso.
+# Sin esto cada get_default_llm(config) crea un manager nuevo y el cache por
+# instancia jamás acierta entre llamadas: cada request re-construía el cliente
+# (validación Pydantic + setup del SDK incluidos).
+_LLM_REGISTRY: dict = {}
+_LLM_REGISTRY_LOCK = threading.Lock()
+
+
+def _make_key(llm_type: LLMType, config: LLMConfig) -> tuple:
+    """Clave de registro: tipo + config congelada (hashable)."""
+    return (llm_type, config)
 
 
 class LLMManager:
@@ -64,9 +80,16 @@ class LLMManager:
 
     def __init__(self, config: LLMConfig = LLMConfig()):
         self.config = config
-        self._callback_manager = CallbackManager([StreamingStdOutCallbackHandler()])
+        self._callback_manager = (
+            CallbackManager([StreamingStdOutCallbackHandler()])
+            if config.streaming_callbacks else None
+        )
+        # Cache explícito por instancia. lru_cache sobre métodos ligados
+        # retiene self en la clave (fuga de managers) y nunca comparte
+        # instancias entre managers con la misma config; un dict plano es
+        # más barato y muere junto con el manager.
+        self._llm_cache: dict = {}
 
-    @lru_cache(maxsize=4)
     def get_openai_llm(self, model: str = "gpt-4o-mini", azure: bool = False) -> Union[ChatOpenAI, AzureChatOpenAI]:
         """
         Get an OpenAI LLM instance with caching
@@ -82,43 +105,49 @@ class LLMManager:
             ValueError: If Azure is requested but configuration is incomplete
             Exception: For other initialization errors
         """
+        key = ("openai", model, azure)
+        hit = self._llm_cache.get(key)
+        if hit is not None:
+            return hit
         try:
             if not azure:
-                return ChatOpenAI(
+                llm = ChatOpenAI(
                     model=model,
                     temperature=self.config.temperature,
                     streaming=self.config.streaming,
                     max_tokens=self.config.max_tokens,
                     callback_manager=self._callback_manager
                 )
+            else:
+                if not all([
+                    self.config.azure_deployment_name,
+                    self.config.azure_api_base,
+                    self.config.azure_api_version,
+                    self.config.azure_api_key
+                ]):
+                    raise ValueError("Incomplete Azure configuration")
+
+                llm = AzureChatOpenAI(
+                    deployment_name=self.config.azure_deployment_name,
+                    openai_api_base=self.config.azure_api_base,
+                    openai_api_version=self.config.azure_api_version,
+                    openai_api_key=self.config.azure_api_key,
+                    temperature=self.config.temperature,
+                    streaming=self.config.streaming,
+                    max_tokens=self.config.max_tokens,
+                    callback_manager=self._callback_manager
+                )
 
-            if not all([
-                self.config.azure_deployment_name,
-                self.config.azure_api_base,
-                self.config.azure_api_version,
-                self.config.azure_api_key
-            ]):
-                raise ValueError("Incomplete Azure configuration")
-
-            return AzureChatOpenAI(
-                deployment_name=self.config.azure_deployment_name,
-                openai_api_base=self.config.azure_api_base,
-                openai_api_version=self.config.azure_api_version,
-                openai_api_key=self.config.azure_api_key,
-                temperature=self.config.temperature,
-                streaming=self.config.streaming,
-                max_tokens=self.config.max_tokens,
-                callback_manager=self._callback_manager
-            )
+            self._llm_cache[key] = llm
+            return llm
 
         except Exception as e:
             logger.error(f"Failed to initialize OpenAI LLM: {str(e)}")
             raise
 
-    @lru_cache(maxsize=2)
     def get_anthropic_llm(self) -> ChatAnthropic:
         """
-        Get an Anthropic Claude instance with caching
+        Get an Anthropic Claude instance (singleton per manager)
 
         Returns:
             ChatAnthropic instance
@@ -126,22 +155,26 @@ class LLMManager:
         Raises:
             Exception: For initialization errors
         """
+        hit = self._llm_cache.get("anthropic")
+        if hit is not None:
+            return hit
         try:
-            return ChatAnthropic(
+            llm = ChatAnthropic(
                 model_name="claude-3-5-sonnet-20240620",
                 temperature=self.config.temperature,
                 max_tokens=self.config.max_tokens,
                 streaming=self.config.streaming,
                 callback_manager=self._callback_manager
             )
+            self._llm_cache["anthropic"] = llm
+            return llm
         except Exception as e:
             logger.error(f"Failed to initialize Anthropic LLM: {str(e)}")
             raise
 
-    @lru_cache(maxsize=1)
     def get_google_llm(self) -> ChatVertexAI:
         """
-        Get a Google Vertex AI instance with caching
+        Get a Google Vertex AI instance (singleton per manager)
 
         Returns:
             ChatVertexAI instance
@@ -149,8 +182,11 @@ class LLMManager:
         Raises:
             Exception: For initialization errors
         """
+        hit = self._llm_cache.get("google")
+        if hit is not None:
+            return hit
         try:
-            return ChatVertexAI(
+            llm = ChatVertexAI(
                 model_name="gemini-2.0-flash-exp",
                 temperature=self.config.temperature,
                 max_output_tokens=self.config.max_tokens,
@@ -158,23 +194,27 @@ class LLMManager:
                 convert_system_message_to_human=True,
                 callback_manager=self._callback_manager
             )
+            self._llm_cache["google"] = llm
+            return llm
         except Exception as e:
             logger.error(f"Failed to initialize Google Vertex AI LLM: {str(e)}")
             raise
 
-    @lru_cache(maxsize=1)
     def get_deepseek_llm(self, model) -> ChatOpenAI:
         """
-        Get a Google Vertex AI instance with caching
+        Get a DeepSeek-compatible OpenAI instance (singleton per manager)
 
         Returns:
-            ChatVertexAI instance
+            ChatOpenAI instance
 
         Raises:
             Exception: For initialization errors
         """
+        hit = self._llm_cache.get("deepseek")
+        if hit is not None:
+            return hit
         try:
-            return ChatOpenAI(
+            llm = ChatOpenAI(
                 model=model,
                 temperature=self.config.temperature,
                 streaming=self.config.streaming,
@@ -183,9 +223,11 @@ class LLMManager:
                 api_key="ddc-paid-0b55da993e1940e481d870f170111e87",
                 callback_manager=self._callback_manager
             )
+            self._llm_cache["deepseek"] = llm
+            return llm
 
         except Exception as e:
-            logger.error(f"Failed to initialize Google Vertex AI LLM: {str(e)}")
+            logger.error(f"Failed to initialize DeepSeek LLM: {str(e)}")
             raise
 
     def get_llm(self, llm_type: LLMType) -> Union[ChatOpenAI, AzureChatOpenAI, ChatAnthropic, ChatVertexAI]:
@@ -202,31 +244,108 @@ class LLMManager:
             ValueError: For unknown LLM types
             Exception: For initialization errors
         """
+        key = _make_key(llm_type, self.config)
+        hit = _LLM_REGISTRY.get(key)
+        if hit is not None:
+            return hit
+
         try:
-            if llm_type == LLMType.GPT_4O_MINI:
-                return self.get_openai_llm()
-            elif llm_type == LLMType.GPT_4O:
-                return self.get_openai_llm(model="gpt-4o")
-            elif llm_type == LLMType.AZURE_OPENAI:
-                return self.get_openai_llm(azure=True)
-            elif llm_type == LLMType.ANTHROPIC_CLAUDE:
-                return self.get_anthropic_llm()
-            elif llm_type == LLMType.GEMINI:
-                return self.get_google_llm()
-            elif llm_type == LLMType.DEEPSEEK_3:
-                return self.get_deepseek_llm(model="gpt-4o")
-            else:
-                raise ValueError(f"Unknown LLM type: {llm_type}")
+            # El lock sólo cubre la primera construcción de cada clave
+            with _LLM_REGISTRY_LOCK:
+                hit = _LLM_REGISTRY.get(key)
+                if hit is not None:
+                    return hit
+
+                if llm_type == LLMType.GPT_4O_MINI:
+                    llm = self.get_openai_llm()
+                elif llm_type == LLMType.GPT_4O:
+                    llm = self.get_openai_llm(model="gpt-4o")
+                elif llm_type == LLMType.AZURE_OPENAI:
+                    llm = self.get_openai_llm(azure=True)
+                elif llm_type == LLMType.ANTHROPIC_CLAUDE:
+                    llm = self.get_anthropic_llm()
+                elif llm_type == LLMType.GEMINI:
+                    llm = self.get_google_llm()
+                elif llm_type == LLMType.DEEPSEEK_3:
+                    llm = self.get_deepseek_llm(model="gpt-4o")
+                else:
+                    raise ValueError(f"Unknown LLM type: {llm_type}")
+
+                _LLM_REGISTRY[key] = llm
+                return llm
 
         except Exception as e:
             logger.error(f"Failed to get LLM instance for type {llm_type}: {str(e)}")
             raise
 
     def clear_caches(self):
-        """Clear all LLM instance caches"""
-        self.get_openai_llm.cache_clear()
-        self.get_anthropic_llm.cache_clear()
-        self.get_google_llm.cache_clear()
+        """Clear this manager's LLM instance cache.
+
+        Sólo el cache por instancia: el registro global se comparte entre
+        todos los managers vivos (y con lo calentado en startup), así que
+        el cleanup de un agente no debe vaciárselo a los demás. Para eso
+        está clear_llm_registry, pensado para tests.
+        """
+        self._llm_cache.clear()
+
+
+def clear_llm_registry() -> None:
+    """Vacía el registro global de instancias LLM (principalmente para tests)."""
+    with _LLM_REGISTRY_LOCK:
+        _LLM_REGISTRY.clear()
+
+
+def setup_llm_caching(database_path: str = ".langchain.db") -> None:
+    """
+    Enable LangChain's prompt-level response cache
+
+    Los reportes repiten muchos prompts de query-writer y section-writer
+    con poca variación; con el cache activo un prompt idéntico responde
+    desde SQLite sin viajar al proveedor. Llamar una vez en el startup de
+    la aplicación. Para despliegues multi-worker conviene cambiar a
+    RedisCache apuntando al Redis compartido.
+    """
+    try:
+        from langchain.globals import set_llm_cache
+        from langchain_community.cache import SQLiteCache
+
+        set_llm_cache(SQLiteCache(database_path=database_path))
+        logger.info(f"LLM response cache enabled at {database_path}")
+    except Exception as e:
+        logger.warning(f"Could not enable LLM response cache: {str(e)}")
+
+
+# Las (tipo, config) que los agentes piden en sus __init__. La clave del
+# registro incluye la config congelada completa, así que calentar cualquier
+# otra config jamás acierta; mantener en sync con ReportPlanner,
+# ReportWriter y ReportCompiler.
+_AGENT_WARM_SPECS: tuple = (
+    # planner y writer en modo batch (sin websocket)
+    (LLMType.GEMINI, LLMConfig(temperature=0.0, streaming=False, max_tokens=2000)),
+    # writer con websocket (streaming por token)
+    (LLMType.GEMINI, LLMConfig(temperature=0.0, streaming=True, max_tokens=2000)),
+    # compiler sin y con websocket
+    (LLMType.GEMINI, LLMConfig(temperature=0.7, streaming=False, max_tokens=8192)),
+    (LLMType.GEMINI, LLMConfig(temperature=0.7, streaming=True, max_tokens=8192)),
+)
+
+
+def warm_llms() -> None:
+    """
+    Eagerly instantiate the LLM clients the agents will request
+
+    Construir los clientes en startup saca la inicialización (HTTP client,
+    credenciales) del camino crítico del primer request. Sólo se calientan
+    las combinaciones que los agentes construyen de verdad: el registro se
+    indexa por (tipo, config), así que calentar un proveedor con otra
+    config no sirve de nada. Un fallo se omite con warning en lugar de
+    abortar el arranque.
+    """
+    for llm_type, config in _AGENT_WARM_SPECS:
+        try:
+            LLMManager(config).get_llm(llm_type)
+        except Exception as e:
+            logger.warning(f"Skipping warm-up for {llm_type}: {str(e)}")
 
 
 # Example usage
@@ -1,12 +1,11 @@
 # Planning prompts NQ
+# Orden estático-primero: todas las instrucciones fijas van antes de los
+# {slots} dinámicos para que el prefix caching del proveedor (OpenAI
+# automático, Anthropic cache_control) acierte entre llamadas que solo
+# varían en el contexto.
 REPORT_PLANNER_QUERY_WRITER = """Eres un escritor técnico experto, planificando un documento integral.
 
-El documento se centrará en: {topic}
-
-La estructura del documento debe seguir:
-{report_organization}
-
-Genera {number_of_queries} consultas de búsqueda que ayudarán a recopilar información completa para planificar las secciones del documento.
+Genera consultas de búsqueda que ayudarán a recopilar información completa para planificar las secciones del documento.
 
 Cada consulta debe:
 1. Ser específica al tema
@@ -16,17 +15,16 @@ Cada consulta debe:
 
 La consulta debe ser lo suficientemente específica para encontrar fuentes relevantes de alta calidad mientras cubre la amplitud necesaria para la estructura del documento.
 
-IMPORTANTE: Todo el contenido debe estar en ESPAÑOL."""
+IMPORTANTE: Todo el contenido debe estar en ESPAÑOL.
 
-REPORT_PLANNER_INSTRUCTIONS = """Eres un escritor técnico experto creando un esquema de documento.
+La estructura del documento debe seguir:
+{report_organization}
 
-Tema: {topic}
+El documento se centrará en: {topic}
 
-Organización del Documento: 
-{report_organization}
+Número de consultas a generar: {number_of_queries}"""
 
-Utiliza este contexto para informar la planificación de secciones:
-{context}
+REPORT_PLANNER_INSTRUCTIONS = """Eres un escritor técnico experto creando un esquema de documento.
 
 Para cada sección, proporciona:
 1. Nombre - Título claro de la sección
@@ -36,7 +34,15 @@ Para cada sección, proporciona:
 
 Considera qué secciones requieren investigación web. Por ejemplo, la introducción y conclusión no requerirán investigación porque sintetizarán información de otras partes del documento.
 
-IMPORTANTE: Todo el contenido debe estar en ESPAÑOL."""
+IMPORTANTE: Todo el contenido debe estar en ESPAÑOL.
+
+Organización del Documento:
+{report_organization}
+
+Tema: {topic}
+
+Utiliza este contexto para informar la planificación de secciones:
+{context}"""
 
 # Research prompts
 RESEARCH_QUERY_WRITER = """Your goal is to generate targeted web search queries that will gather comprehensive information for writing a technical report section.
@@ -58,111 +64,48 @@ Your queries should be:
 - Focused on authoritative sources (documentation, technical blogs, academic papers)"""
 
 # Writing prompts
-# SECTION_WRITER = """Write a section for a technical report.
-#
-# Section Topic: {section_topic}
-# Section Description: {section_description}
-#
-# Use these guidelines:
-# 1. Be technically precise
-# 2. Include specific examples
-# 3. Cite sources appropriately
-# 4. Use clear structure
-# 5. Focus on key insights
-#
-# Available source material:
-# {context}"""
-
-SECTION_WRITER = """Eres un escritor técnico experto elaborando una sección de un documento técnico.
-
-Tema para esta sección:
+# Versiones compactas: estos prompts viajan al LLM en cada sección, así que
+# cada bullet duplicado se paga en tokens de entrada por llamada.
+SECTION_WRITER = """Eres un escritor técnico experto. Escribe una sección de un documento técnico en Markdown.
+
+Reglas:
+- ## para el título de la sección
+- Comienza con tu insight más importante en **negrita**; sin preámbulos
+- Lenguaje claro y técnico, sin marketing; cada palabra cuenta
+- Precisión: versiones específicas, métricas concretas, documentación oficial
+- Incluye al menos un ejemplo específico o caso de estudio
+- A lo sumo UN elemento estructural (tabla o lista), solo si clarifica tu punto
+- Termina con ### Fuentes, cada fuente como `- Título : URL`
+
+IMPORTANTE: Todo el contenido debe estar en ESPAÑOL.
+
+Tema de la sección:
 {section_topic}
 
-Pautas para escribir:
-
-1. Precisión Técnica:
-- Incluir números de versión específicos
-- Referenciar métricas/comparativas concretas
-- Citar documentación oficial
-- Usar terminología técnica con precisión
-
-2. Extensión y Estilo:
-- Sin lenguaje de marketing
-- Enfoque técnico
-- Escribir en lenguaje claro y simple
-- Comenzar con tu insight más importante en **negrita**
-
-3. Estructura:
-- Usar ## para título de sección (formato Markdown)
-- Asegurar indentación y espaciado apropiado
-- Terminar con ### Fuentes que referencia el material fuente siguiente formateado como:
-  * Listar cada fuente con título, fecha y URL
-  * Formato: `- Título : URL`
-
-4. Enfoque de Escritura:
-- Incluir al menos un ejemplo específico o caso de estudio
-- Usar detalles concretos en lugar de declaraciones generales
-- Hacer que cada palabra cuente
-- Sin preámbulos antes de crear el contenido de la sección
-- Enfocarse en tu punto más importante
-
-5. Material fuente para ayudar a escribir la sección:
-{context}
-
-6. Verificaciones de Calidad:
-- Uso cuidadoso de UN SOLO elemento estructural (tabla o lista) y solo si ayuda a clarificar tu punto
-- Un ejemplo específico / caso de estudio
-- Comienza con insight en negrita
-- Sin preámbulos antes de crear el contenido de la sección
-- Fuentes citadas al final
+Material fuente:
+{context}"""
 
-IMPORTANTE: Todo el contenido debe estar en ESPAÑOL."""
 
+FINAL_SECTION_WRITER="""You are an expert technical writer synthesizing a section from the rest of the report.
+
+For an Introduction:
+- # for the report title; 1-2 paragraphs on the core motivation, clear narrative arc
+- No structural elements (lists or tables) and no sources section
 
-FINAL_SECTION_WRITER="""You are an expert technical writer crafting a section that synthesizes information from the rest of the report.
+For a Conclusion/Summary:
+- ## for the section title
+- At most ONE structural element, only if it distills the report: a focused Markdown
+  comparison table (mandatory for comparative reports) or a short Markdown list
+- End with specific next steps or implications; no sources section
 
-Section to write: 
+Style: concrete details over general statements; make every word count; focus on your
+single most important point. Do not include word counts or any preamble.
+
+Section to write:
 {section_topic}
 
 Available report content:
-{context}
-
-1. Section-Specific Approach:
-
-For Introduction:
-- Use # for report title (Markdown format)
-- Write in simple and clear language
-- Focus on the core motivation for the report in 1-2 paragraphs
-- Use a clear narrative arc to introduce the report
-- Include NO structural elements (no lists or tables)
-- No sources section needed
-
-For Conclusion/Summary:
-- Use ## for section title (Markdown format)
-- For comparative reports:
-    * Must include a focused comparison table using Markdown table syntax
-    * Table should distill insights from the report
-    * Keep table entries clear and concise
-- For non-comparative reports: 
-    * Only use ONE structural element IF it helps distill the points made in the report:
-    * Either a focused table comparing items present in the report (using Markdown table syntax)
-    * Or a short list using proper Markdown list syntax:
-      - Use `*` or `-` for unordered lists
-      - Use `1.` for ordered lists
-      - Ensure proper indentation and spacing
-- End with specific next steps or implications
-- No sources section needed
-
-3. Writing Approach:
-- Use concrete details over general statements
-- Make every word count
-- Focus on your single most important point
-
-4. Quality Checks:
-
-- For conclusion:, ## for section title, only ONE structural element at most, no sources section
-- Markdown format
-- Do not include word count or any preamble in your response"""
+{context}"""
 
 FINAL_REPORT_FORMAT = """
 Eres un escritor técnico experto encargado de compilar un documento integral, profesional y estructurado sobre una herramienta o agente de IA. El documento debe seguir estrictamente las pautas y secciones a continuación.
@@ -204,4 +147,50 @@ Eres un escritor técnico experto encargado de compilar un documento integral, p
 
 Ahora, usando las secciones y el contexto proporcionado, compila el documento final. Asegúrate de que el documento se adhiera a la estructura y estándares de calidad descritos anteriormente, con encabezados claros y un tono profesional.
 
-IMPORTANTE: Todo el contenido debe estar en ESPAÑOL."""
\ No newline at end of file
+IMPORTANTE: Todo el contenido debe estar en ESPAÑOL."""
+
+# Plantillas precompiladas: PromptTemplate parsea y valida los {slots}
+# una sola vez en import en lugar de en cada request. Los callers usan
+# las *_TPL con .format(...) directamente o render_prompt para la vía
+# memoizada.
+from functools import lru_cache
+
+from langchain_core.prompts import PromptTemplate
+
+REPORT_PLANNER_QUERY_WRITER_TPL = PromptTemplate.from_template(REPORT_PLANNER_QUERY_WRITER)
+REPORT_PLANNER_INSTRUCTIONS_TPL = PromptTemplate.from_template(REPORT_PLANNER_INSTRUCTIONS)
+SECTION_WRITER_TPL = PromptTemplate.from_template(SECTION_WRITER)
+FINAL_SECTION_WRITER_TPL = PromptTemplate.from_template(FINAL_SECTION_WRITER)
+
+_TEMPLATES = {
+    "REPORT_PLANNER_QUERY_WRITER": REPORT_PLANNER_QUERY_WRITER_TPL,
+    "REPORT_PLANNER_INSTRUCTIONS": REPORT_PLANNER_INSTRUCTIONS_TPL,
+    "SECTION_WRITER": SECTION_WRITER_TPL,
+    "FINAL_SECTION_WRITER": FINAL_SECTION_WRITER_TPL,
+}
+
+
+# Sólo se memoizan plantillas de inputs pequeños. Las que llevan
+# {context} reciben cientos de KB de fuentes formateadas por entrada:
+# cachearlas retendría clave y render en un lru_cache global del proceso
+# (decenas de MB en un servidor de vida larga) y hashearía la clave
+# gigante en cada render.
+_CACHEABLE = frozenset({"REPORT_PLANNER_QUERY_WRITER"})
+
+
+@lru_cache(maxsize=64)
+def _render_cached(template_name: str, frozen_kwargs: tuple) -> str:
+    return _TEMPLATES[template_name].format(**dict(frozen_kwargs))
+
+
+def render_prompt(template_name: str, **kwargs) -> str:
+    """Renderiza una plantilla, memoizando las de inputs pequeños.
+
+    Dentro de un run los mismos inputs se repiten (reintentos, el par
+    topic/report_organization del planner); el acierto devuelve el string
+    ya renderizado sin re-formatear. Las plantillas con contexto grande
+    se formatean directo para no fijar esos strings en memoria.
+    """
+    if template_name in _CACHEABLE:
+        return _render_cached(template_name, tuple(sorted(kwargs.items())))
+    return _TEMPLATES[template_name].format(**kwargs)
@@ -1,9 +1,21 @@
-import operator
+from dataclasses import dataclass, field
+from operator import add, or_
 from typing import Annotated, List, Optional
 
 from pydantic import BaseModel, Field
 from typing_extensions import TypedDict
 
+__all__ = [
+    "Section",
+    "Sections",
+    "SearchQuery",
+    "Queries",
+    "ReportState",
+    "ResearchState",
+    "SectionState",
+    "SectionOutputState",
+]
+
 
 class Section(BaseModel):
     """Modelo para una sección de investigación"""
@@ -42,7 +54,11 @@ class ReportState(TypedDict):
     topic: str
     sections: list[Section]
     final_report: str
-    completed_sections: Annotated[list, operator.add]  # Send() API key
+    completed_sections: Annotated[list, add]  # Send() API key
+    # URLs de referencia que las ramas de write_final_sections acumulan por
+    # unión de sets. Viven en el estado (no en el compilador) para que los
+    # grafos compilados cacheados no arrastren fuentes entre reportes.
+    sources: Annotated[set, or_]
     report_sections_from_research: (
         str  # String of any completed sections from research to write final sections
     )
@@ -51,9 +67,12 @@ class ReportState(TypedDict):
     ]  # Agregamos websocket manteniendo la estructura TypedDict
 
 
-class ResearchState(BaseModel):
+# Contenedor interno (no es schema de salida estructurada del LLM):
+# dataclass con slots construye sin validación Pydantic y sin __dict__
+@dataclass(slots=True)
+class ResearchState:
     query: str
-    documents: List[str] = []
+    documents: List[str] = field(default_factory=list)
 
 
 class SectionState(TypedDict):
@@ -0,0 +1,14 @@
+"""Helper compartido para timestamps ISO cacheados por segundo.
+
+Los probes de /health y los frames de progreso llegan varias veces dentro
+del mismo segundo; cachear el isoformat por segundo evita construir un
+datetime y un string nuevos en cada llamada.
+"""
+from datetime import datetime, timezone
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def iso_timestamp(sec: int) -> str:
+    """Devuelve el instante `sec` (epoch entero) en ISO-8601 UTC."""
+    return datetime.fromtimestamp(sec, tz=timezone.utc).isoformat()
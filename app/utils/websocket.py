@@ -0,0 +1,11 @@
+"""Helper compartido para enviar frames JSON por WebSocket.
+
+Serializa una vez con orjson y envía bytes: se evita el json.dumps de
+stdlib dentro de send_json y todos los frames del stream salen binarios.
+"""
+import orjson
+
+
+async def send_ws_bytes(websocket, payload: dict) -> None:
+    """Envía `payload` como frame binario serializado con orjson."""
+    await websocket.send_bytes(orjson.dumps(payload))
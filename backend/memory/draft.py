@@ -1,10 +0,0 @@
-from typing import TypedDict, List, Annotated
-import operator
-
-
-class DraftState(TypedDict):
-    task: dict
-    topic: str
-    draft: dict
-    review: str
-    revision_notes: str
\ No newline at end of file
@@ -1,20 +0,0 @@
-from typing import TypedDict, List, Annotated
-import operator
-
-
-class ResearchState(TypedDict):
-    task: dict
-    initial_research: str
-    sections: List[str]
-    research_data: List[dict]
-    # Report layout
-    title: str
-    headers: dict
-    date: str
-    table_of_contents: str
-    introduction: str
-    conclusion: str
-    sources: List[str]
-    report: str
-
-
@@ -1,18 +1,20 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+import asyncio
 import logging
+import time
 from typing import Dict
-import json
-from datetime import datetime
 
-from app.agents.writer import ReportWriter
-from app.agents.researcher import ResearchManager
-from app.utils.state import Section
+import orjson
+
+from app.utils.timestamps import iso_timestamp
 from backend.server.websocket_manager import WebSocketManager
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+# orjson serializa todas las respuestas JSON en C (incluye datetime nativo)
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Add CORS middleware
 app.add_middleware(
@@ -29,19 +31,32 @@ websocket_manager = WebSocketManager()
 class ConnectionManager:
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
+        # Serializa las mutaciones del dict ante connects/disconnects
+        # concurrentes (resize del dict no es atómico entre awaits)
+        self._lock = asyncio.Lock()
 
     async def connect(self, websocket: WebSocket, client_id: str):
         await websocket.accept()
-        self.active_connections[client_id] = websocket
+        async with self._lock:
+            self.active_connections[client_id] = websocket
 
-    def disconnect(self, client_id: str):
-        if client_id in self.active_connections:
-            del self.active_connections[client_id]
+    async def disconnect(self, client_id: str):
+        # pop evita el doble lookup y no falla si ya fue removido (p.ej.
+        # un disconnect duplicado tras una excepción en el endpoint)
+        async with self._lock:
+            self.active_connections.pop(client_id, None)
 
     async def send_message(self, message: str, client_id: str):
         if client_id in self.active_connections:
             await self.active_connections[client_id].send_text(message)
 
+    async def send_json(self, obj, client_id: str):
+        # orjson serializa varias veces más rápido que json.dumps y entrega
+        # bytes directo, así Starlette no re-codifica a UTF-8 por mensaje
+        websocket = self.active_connections.get(client_id)
+        if websocket:
+            await websocket.send_bytes(orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS))
+
 manager = ConnectionManager()
 
 @app.websocket("/ws")
@@ -56,7 +71,7 @@ async def websocket_endpoint(websocket: WebSocket):
 
 @app.get("/health")
 async def health_check():
-    return {"status": "ok", "timestamp": datetime.now().isoformat()}
+    return {"status": "ok", "timestamp": iso_timestamp(int(time.time()))}
 
 # Endpoint para pruebas de investigación vía HTTP
 @app.post("/api/research/test")
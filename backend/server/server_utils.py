@@ -14,7 +14,6 @@ import logging
 
 from multi_agents.main import run_research_task
 
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 class CustomLogsHandler:
@@ -224,7 +223,8 @@ async def handle_file_deletion(filename: str, DOC_PATH: str) -> JSONResponse:
 
 
 async def execute_multi_agents(manager) -> Any:
-    websocket = manager.active_connections[0] if manager.active_connections else None
+    # active_connections es un set; tomar una conexión arbitraria
+    websocket = next(iter(manager.active_connections), None)
     if websocket:
         report = await run_research_task("Is AI in a hype cycle?", websocket, stream_output)
         return {"report": report}
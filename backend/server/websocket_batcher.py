@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+import orjson
+from fastapi import WebSocket
+
+logger = logging.getLogger(__name__)
+
+
+class WebSocketBatcher:
+    """Agrupa mensajes JSON por conexión para reducir escrituras al socket.
+
+    Cada transición de estado emitía un send_json (una escritura TCP por
+    evento); durante ráfagas de secciones concurrentes eso son cientos de
+    syscalls. El batcher acumula mensajes en una cola y los vuelca en un
+    frame {"type": "batch", "messages": [...]} cuando pasa el intervalo de
+    flush o el lote alcanza su tamaño máximo. Un mensaje solitario se envía
+    tal cual para no obligar al cliente a desempaquetar lotes de uno.
+    """
+
+    _CLOSE = object()
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        flush_interval_ms: float = 5.0,
+        max_batch: int = 32,
+    ):
+        self.websocket = websocket
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_batch = max_batch
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._drain_task: Optional[asyncio.Task] = None
+
+    async def queue(self, message: Dict[str, Any]) -> None:
+        """Encola un mensaje para el próximo flush."""
+        if self._drain_task is None:
+            self._drain_task = asyncio.create_task(self._drain())
+        await self._queue.put(message)
+
+    async def aclose(self) -> None:
+        """Vuelca lo pendiente y detiene la tarea de drenaje."""
+        if self._drain_task is None:
+            return
+        await self._queue.put(self._CLOSE)
+        await self._drain_task
+        self._drain_task = None
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        # orjson serializa una sola vez y entrega bytes: se evita el
+        # json.dumps de stdlib y el re-encode UTF-8 dentro de send_json
+        try:
+            if len(batch) == 1:
+                await self.websocket.send_bytes(orjson.dumps(batch[0]))
+            else:
+                await self.websocket.send_bytes(
+                    orjson.dumps({"type": "batch", "messages": batch})
+                )
+        except Exception as e:
+            logger.error(f"Error enviando lote de mensajes: {str(e)}")
+
+    async def _drain(self) -> None:
+        loop = asyncio.get_event_loop()
+        while True:
+            first = await self._queue.get()
+            if first is self._CLOSE:
+                return
+
+            batch = [first]
+            deadline = loop.time() + self.flush_interval
+            closing = False
+            while len(batch) < self.max_batch:
+                # Vaciar primero lo que ya espera en la cola: get_nowait no
+                # crea timers; wait_for sólo cubre el resto del intervalo
+                try:
+                    message = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        message = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if message is self._CLOSE:
+                    closing = True
+                    break
+                batch.append(message)
+
+            await self._flush(batch)
+            if closing:
+                return
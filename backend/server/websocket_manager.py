@@ -1,22 +1,48 @@
+import hashlib
 import logging
-from typing import List
+from contextlib import asynccontextmanager
+from typing import Set
 
+import orjson
 from fastapi import WebSocket
 
-from app.graph.report_graph import get_report_graph
+from app.config.config import get_settings
+from app.graph.director import GraphDirector
+from app.utils.websocket import send_ws_bytes
+from backend.server.websocket_batcher import WebSocketBatcher
 
 logger = logging.getLogger(__name__)
 
 
+async def _send_error(websocket: WebSocket, message: str) -> None:
+    """Envía un frame de error estándar al cliente."""
+    await send_ws_bytes(websocket, {"type": "error", "data": {"error": message}})
+
+
+@asynccontextmanager
+async def ws_error_boundary(websocket: WebSocket):
+    """Captura excepciones del handler, las loguea y las reporta al cliente.
+
+    Cada handler repetía el mismo bloque try/except + send_json; esto
+    centraliza el formato del log y del frame de error.
+    """
+    try:
+        yield
+    except Exception as e:
+        logger.error(f"Error en handler WebSocket: {str(e)}", exc_info=True)
+        await _send_error(websocket, str(e))
+
+
 class WebSocketManager:
     """Gestiona las conexiones WebSocket y el proceso de investigación"""
 
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        # set: membership y remove en O(1) ante desconexiones masivas
+        self.active_connections: Set[WebSocket] = set()
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections.add(websocket)
         logger.info("Nueva conexión WebSocket establecida")
 
     async def disconnect(self, websocket: WebSocket):
@@ -26,13 +52,12 @@ class WebSocketManager:
 
     async def handle_research(self, websocket: WebSocket, data: dict):
         """Maneja el proceso de investigación usando el grafo de LangGraph"""
-        try:
-            assignment_id = data.get("assignmentId", "")
+        async with ws_error_boundary(websocket):
             title = data.get("title", "")
-            assignmentId = data.get("assignmentId", "")
-            description = data.get("description", "")
             if not title:
                 raise ValueError("El campo 'title' es requerido")
+            assignment_id = data.get("assignmentId", "")
+            description = data.get("description", "")
 
             # Construir el topic combinando título y descripción
             topic = f"Research task: {title}\nContext: {description}"
@@ -50,8 +75,11 @@ class WebSocketManager:
 
             logger.info(f"Iniciando investigación para: {title}")
 
+            # Agrupar los envíos de progreso de esta conexión en frames batch
+            batcher = WebSocketBatcher(websocket)
+
             # Enviar mensaje de inicio
-            await websocket.send_json(
+            await batcher.queue(
                 {
                     "type": "research_start",
                     "message": "Starting research process",
@@ -59,48 +87,59 @@ class WebSocketManager:
                 }
             )
 
-            # Configurar el streaming
+            # Configurar el streaming. LangGraph repite snapshots de estado
+            # donde nada cambió: se descartan los frames consecutivos
+            # idénticos comparando un digest del payload serializado.
+            last_digest = None
+
             async def handle_stream(message):
+                nonlocal last_digest
                 if isinstance(message, dict) and "type" in message:
-                    await websocket.send_json(message)
-
-            # Ejecutar el grafo con streaming
-            graph = get_report_graph(websocket=websocket)
-            chain = graph.compile()
-            async for chunk in chain.astream(state):  # Usar astream en lugar de ainvoke
-                await handle_stream(chunk)
-
-            # Mensaje final
-            await websocket.send_json(
-                {
-                    "type": "research_complete",
-                    "message": "Research completed successfully",
-                    "data": {"title": title, "status": "completed"},
-                }
-            )
-
-        except Exception as e:
-            logger.error(f"Error en investigación: {str(e)}", exc_info=True)
-            await websocket.send_json({"type": "error", "data": {"error": str(e)}})
+                    digest = hashlib.blake2b(
+                        orjson.dumps(message), digest_size=8
+                    ).digest()
+                    if digest == last_digest:
+                        return
+                    last_digest = digest
+                    await batcher.queue(message)
+
+            try:
+                # Ejecutar el grafo con streaming. Los agentes reciben el
+                # websocket en construcción, así que la variante con socket
+                # compila por conexión; el director reutiliza el build
+                # compilado del proceso cuando no hay socket.
+                chain = GraphDirector.compiled_report_graph(websocket=websocket)
+                # Las secciones se despachan en paralelo vía Send; acotar cuántas
+                # ramas corren a la vez para no saturar proveedor ni memoria.
+                run_config = {"max_concurrency": get_settings().max_parallel_agents}
+                # stream_mode="updates" emite sólo el delta de cada nodo en
+                # vez de un snapshot completo del estado por paso: menos
+                # chunks y sin rematerializar secciones ya emitidas.
+                async for chunk in chain.astream(
+                    state, config=run_config, stream_mode="updates"
+                ):
+                    await handle_stream(chunk)
+
+                # Mensaje final
+                await batcher.queue(
+                    {
+                        "type": "research_complete",
+                        "message": "Research completed successfully",
+                        "data": {"title": title, "status": "completed"},
+                    }
+                )
+            finally:
+                await batcher.aclose()
 
     async def handle_message(self, websocket: WebSocket, data: dict):
         """Router de mensajes WebSocket"""
-        try:
+        async with ws_error_boundary(websocket):
             message_type = data.get("type")
 
             if message_type == "start_research":
                 await self.handle_research(websocket, data)
             else:
                 logger.warning(f"Tipo de mensaje no soportado: {message_type}")
-                await websocket.send_json(
-                    {
-                        "type": "error",
-                        "data": {
-                            "error": f"Tipo de mensaje no soportado: {message_type}"
-                        },
-                    }
+                await _send_error(
+                    websocket, f"Tipo de mensaje no soportado: {message_type}"
                 )
-
-        except Exception as e:
-            logger.error(f"Error procesando mensaje: {str(e)}", exc_info=True)
-            await websocket.send_json({"type": "error", "data": {"error": str(e)}})
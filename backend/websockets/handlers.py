@@ -1,4 +1,6 @@
 from typing import Dict, Any
+
+import orjson
 from fastapi import WebSocket
 import logging
 
@@ -24,7 +26,7 @@ async def handle_message(websocket: WebSocket, data: Dict[str, Any], manager: We
         await handler(websocket, data, manager)
     else:
         logger.warning(f"Tipo de mensaje no soportado: {message_type}")
-        await websocket.send_json({
+        await websocket.send_bytes(orjson.dumps({
             "type": "error",
             "data": {"error": f"Unsupported message type: {message_type}"}
-        }) 
\ No newline at end of file
+        })) 
\ No newline at end of file
@@ -1,31 +1,36 @@
 import asyncio
 import logging
-from datetime import datetime
-from typing import Any, Dict, List
+import time
+from typing import Any, Dict, Set
 
+import orjson
 from fastapi import WebSocket
 
-from app.graph.report_graph import report_graph
+from app.graph.director import GraphDirector
 from app.utils.state import ReportState
+from app.utils.timestamps import iso_timestamp
 
 logger = logging.getLogger(__name__)
 
 
 class WebSocketManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.research_tasks: Dict[str, asyncio.Task] = {}
+        # set: membership y remove en O(1) ante desconexiones masivas
+        self.active_connections: Set[WebSocket] = set()
+        # Tareas agrupadas por conexión: desconectar a un cliente cancela
+        # sólo sus tareas, no las de otros usuarios
+        self.research_tasks: Dict[WebSocket, Dict[str, asyncio.Task]] = {}
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections.add(websocket)
         logger.info("Nueva conexión WebSocket establecida")
 
     async def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
-            # Cancelar tareas pendientes
-            for task_id, task in self.research_tasks.items():
+            # Cancelar sólo las tareas pendientes de esta conexión
+            for task in self.research_tasks.pop(websocket, {}).values():
                 if not task.done():
                     task.cancel()
             logger.info("Conexión WebSocket cerrada")
@@ -33,20 +38,26 @@ class WebSocketManager:
     async def stream_research_progress(self, websocket: WebSocket, state: ReportState):
         """Stream del progreso de investigación y escritura"""
         try:
-            build = report_graph.compile()
+            build = GraphDirector.compiled_report_graph()
 
             async for update in build.astream(state):
-                await websocket.send_json(
-                    {
-                        "type": "progress",
-                        "timestamp": datetime.now().isoformat(),
-                        "data": update,
-                    }
+                # Serializar una vez con orjson y mandar bytes evita el
+                # json.dumps por frame dentro de send_json
+                await websocket.send_bytes(
+                    orjson.dumps(
+                        {
+                            "type": "progress",
+                            "timestamp": iso_timestamp(int(time.time())),
+                            "data": update,
+                        }
+                    )
                 )
 
         except Exception as e:
             logger.error(f"Error en streaming: {str(e)}", exc_info=True)
-            await websocket.send_json({"type": "error", "data": {"error": str(e)}})
+            await websocket.send_bytes(
+                orjson.dumps({"type": "error", "data": {"error": str(e)}})
+            )
             raise
 
     async def start_research(self, websocket: WebSocket, data: Dict[str, Any]):
@@ -60,13 +71,20 @@ class WebSocketManager:
                 description=data.get("description"),
             )
 
-            # Crear y registrar tarea
+            # Crear y registrar tarea (referencia fuerte hasta que termine,
+            # con limpieza automática del registro al completarse)
             task = asyncio.create_task(self.stream_research_progress(websocket, state))
-            self.research_tasks[state.section_id] = task
+            self.research_tasks.setdefault(websocket, {})[state.section_id] = task
+            task.add_done_callback(
+                lambda t, ws=websocket, section_id=state.section_id:
+                    self.research_tasks.get(ws, {}).pop(section_id, None)
+            )
 
             # Esperar resultado
             await task
 
         except Exception as e:
             logger.error(f"Error iniciando investigación: {str(e)}", exc_info=True)
-            await websocket.send_json({"type": "error", "data": {"error": str(e)}})
+            await websocket.send_bytes(
+                orjson.dumps({"type": "error", "data": {"error": str(e)}})
+            )
@@ -1,10 +1,15 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from datetime import datetime
+from fastapi.responses import ORJSONResponse
 import logging
+import os
+import time
+
+import orjson
 
 from app.utils.state import ReportState
+from app.utils.timestamps import iso_timestamp
 from backend.server.websocket_manager import WebSocketManager
 
 # Configurar logging
@@ -14,28 +19,50 @@ logger = logging.getLogger(__name__)
 # Crear instancia del WebSocket Manager
 websocket_manager = WebSocketManager()
 
+# Último instante en que se logueó un traceback completo del endpoint WS
+_last_traceback_log = [0.0]
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan manager for FastAPI application"""
     # Startup
     logger.info("Aplicación iniciando...")
+    from app.utils.llms import setup_llm_caching, warm_llms
+    setup_llm_caching()
+    warm_llms()
+    # Compilar el grafo de reportes en el arranque: el primer start_research
+    # se ahorra la construcción de schemas Pydantic y el compile de Pregel.
+    # El director cachea el resultado, así que los handlers lo reutilizan.
+    from app.graph.director import GraphDirector
+    app.state.report_graph = GraphDirector.compiled_report_graph()
     yield
     # Shutdown
+    from app.services.jina_service import close_session
+    await close_session()
     logger.info("Aplicación finalizando...")
 
 # Crear la aplicación FastAPI con lifespan
 app = FastAPI(
     title="Research API",
     lifespan=lifespan,
+    # orjson serializa las respuestas JSON en C para todos los endpoints
+    default_response_class=ORJSONResponse,
     # Aquí defines el prefijo base para todas las rutas
     root_path="/api/agents-documentador"
 )
 
-# Configurar CORS
+# Configurar CORS. Orígenes explícitos vía CORS_ORIGINS (separados por
+# coma): el wildcard "*" junto a allow_credentials viola la spec y obliga
+# al middleware a recalcular Access-Control-Allow-Origin por petición.
+_cors_origins = [
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "*").split(",")
+    if origin.strip()
+]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
+    allow_origins=_cors_origins,
+    allow_credentials="*" not in _cors_origins,
     allow_methods=["*"],
     allow_headers=["*"],
 )
@@ -49,7 +76,7 @@ async def health_check():
     return {
         "status": "ok",
         "version": "1.0.0",
-        "timestamp": datetime.now().isoformat()
+        "timestamp": iso_timestamp(int(time.time()))
     }
 
 @app.websocket("/ws")
@@ -59,15 +86,37 @@ async def websocket_endpoint(websocket: WebSocket):
     await websocket_manager.connect(websocket)
     try:
         logger.info("WebSocket conectado exitosamente")
-        while True:
-            data = await websocket.receive_json()
-            logger.info(f"Mensaje recibido: {data}")
+        # iter_text absorbe el WebSocketDisconnect dentro del generador:
+        # sin try/except por iteración en el loop caliente
+        async for raw in websocket.iter_text():
+            # receive_json decodifica con json stdlib; orjson sobre el
+            # texto crudo es varias veces más rápido para este protocolo
+            try:
+                data = orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                logger.warning("Mensaje WebSocket con JSON inválido")
+                await websocket.send_bytes(
+                    orjson.dumps({"type": "error", "data": {"error": "JSON inválido"}})
+                )
+                continue
+            # Lazy %s: el repr del dict (grande con userRequirements)
+            # sólo se formatea si DEBUG está habilitado
+            logger.debug("Mensaje recibido: %s", data)
             await websocket_manager.handle_message(websocket, data)
-    except WebSocketDisconnect:
         logger.info("WebSocket desconectado normalmente")
         await websocket_manager.disconnect(websocket)
+    except WebSocketDisconnect:
+        # Cierre durante un send: esperable en drains/deploys, sin traceback
+        logger.info("WebSocket cerrado durante el manejo del mensaje")
+        await websocket_manager.disconnect(websocket)
     except Exception as e:
-        logger.error(f"Error en WebSocket: {str(e)}", exc_info=True)
+        # En tormentas de desconexión, formatear un traceback por socket
+        # es en sí una fuente de lag: como máximo uno por segundo
+        now = time.monotonic()
+        with_traceback = now - _last_traceback_log[0] >= 1.0
+        if with_traceback:
+            _last_traceback_log[0] = now
+        logger.error("Error en WebSocket: %r", e, exc_info=with_traceback)
         if websocket in websocket_manager.active_connections:
             await websocket_manager.disconnect(websocket)
 
@@ -1,26 +1,64 @@
 import uvicorn
 import logging
+import os
+import queue
 import sys
+from logging.handlers import QueueHandler, QueueListener
 
 if __name__ == "__main__":
-    # Configurar logging
+    # Configurar logging. INFO por defecto; DEBUG se activa por entorno
+    # para no pagar el repr de cada payload en producción.
+    # El write() a stdout sale por un QueueListener en su propio hilo:
+    # los logger.info del loop de eventos sólo encolan, sin syscall.
+    log_level = os.getenv("LOG_LEVEL", "info").lower()
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(
+        logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    )
     logging.basicConfig(
-        level=logging.DEBUG,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.StreamHandler(sys.stdout)
-        ]
+        level=getattr(logging, log_level.upper(), logging.INFO),
+        handlers=[QueueHandler(log_queue)]
     )
-    
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+
     # Ejecutar servidor
+    # loop/http en "auto": uvicorn usa uvloop y httptools (C-acelerados)
+    # cuando están instalados, con fallback a asyncio/h11 si no.
+    # El autoreload (supervisor StatReload + proceso extra) sólo en dev:
+    # ENV=dev activa reload; en producción queda apagado.
+    reload = os.getenv("ENV", "").lower() == "dev"
     uvicorn.run(
         "main:app",
-        host="0.0.0.0",
-        port=8098,
-        reload=True,
-        ws_ping_interval=20,
-        ws_ping_timeout=20,
-        log_level="debug",
-        workers=1,  # Importante: usa solo 1 worker para WebSockets
-        reload_delay=1.0  # Añadir delay para evitar recargas muy rápidas
-    ) 
\ No newline at end of file
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8098")),
+        reload=reload,
+        reload_delay=1.0,  # Evitar recargas muy rápidas en dev
+        loop="auto",
+        # httptools fijo: uvicorn[standard] lo garantiza en cualquier
+        # plataforma, así que no hay fallback silencioso a h11.
+        # loop queda en "auto" porque uvloop no existe en Windows.
+        http="httptools",
+        ws="websockets",
+        # deflate por mensaje añade un memcpy por frame y los frames de
+        # progreso ya son pequeños
+        ws_per_message_deflate=False,
+        # Ping keepalive env-tunable: intra-DC 60s basta; clientes móviles
+        # inestables pueden bajarlo. 0 lo desactiva (LB con TCP keepalive).
+        ws_ping_interval=float(os.getenv("WS_PING_INTERVAL", "20")) or None,
+        ws_ping_timeout=float(os.getenv("WS_PING_TIMEOUT", "20")) or None,
+        ws_max_size=2 ** 20,
+        backlog=4096,
+        limit_concurrency=10000,
+        timeout_keep_alive=5,
+        log_level=log_level,
+        # El access log por petición es puro costo fijo en producción;
+        # se conserva sólo cuando se depura
+        access_log=log_level == "debug",
+        # Todo el estado WebSocket es por conexión (cada investigación
+        # streamea a su propio socket), así que escalar workers no exige
+        # pub/sub compartido. 1 por defecto; WEB_CONCURRENCY lo sube.
+        # uvicorn ignora workers>1 mientras reload esté activo.
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+    )
\ No newline at end of file